@@ -1,10 +1,12 @@
 from framework.node.Node import *
 from framework.task.Task import *
+from metrics.powermodels.PM import PowerTable
 from framework.server.controller import *
 from time import time, sleep
 from pdb import set_trace as bp
 import multiprocessing
 from joblib import Parallel, delayed
+import numpy as np
 
 num_cores = multiprocessing.cpu_count()
 
@@ -28,6 +30,10 @@ class Framework():
 		self.environment = env
 		self.controller = RequestHandler(self.db, self)
 		self.addHostlistInit(hostinit)
+		self.hostContainerIDs = [set() for _ in range(self.hostlimit)]
+		self.containersByCID = {}
+		self.powertable = PowerTable([host.powermodel for host in self.hostlist])
+		self.hostIPSCaps = np.array([host.ipsCap for host in self.hostlist], dtype=float)
 		self.globalStartTime = time()
 		self.intervalAllocTimings = []
 	
@@ -44,6 +50,7 @@ class Framework():
 	def addContainerInit(self, CreationID, CreationInterval, SLA, Application):
 		container = Task(len(self.containerlist), CreationID, CreationInterval, SLA, Application, self, HostID = -1)
 		self.containerlist.append(container)
+		self.containersByCID[CreationID] = container
 		return container
 
 	def addContainerListInit(self, containerInfoList):
@@ -60,6 +67,7 @@ class Framework():
 			if c == None or not c.active:
 				container = Task(i, CreationID, CreationInterval, SLA, Application, self, HostID = -1)
 				self.containerlist[i] = container
+				self.containersByCID[CreationID] = container
 				return container
 
 	def addContainerList(self, containerInfoList):
@@ -71,19 +79,17 @@ class Framework():
 		return [container.id for container in deployedContainers]
 
 	def getContainersOfHost(self, hostID):
-		containers = []
-		for container in self.containerlist:
-			if container and container.hostid == hostID:
-				containers.append(container.id)
-		return containers
+		return sorted(self.hostContainerIDs[hostID])
+
+	def updateContainerHost(self, containerID, oldHostID, newHostID):
+		if oldHostID != -1: self.hostContainerIDs[oldHostID].discard(containerID)
+		if newHostID != -1: self.hostContainerIDs[newHostID].add(containerID)
 
 	def getContainerByID(self, containerID):
 		return self.containerlist[containerID]
 
 	def getContainerByCID(self, creationID):
-		for c in self.containerlist + self.inactiveContainers:
-			if c and c.creationID == creationID:
-				return c
+		return self.containersByCID.get(creationID)
 
 	def getHostByID(self, hostID):
 		return self.hostlist[hostID]
@@ -107,12 +113,30 @@ class Framework():
 				ramsizereq <= ramsizeav and \
 				disksizereq <= disksizeav)
 
+	def getHostsAvailable(self):
+		# IPS, RAM size and disk size available on each host, [hosts x 3]
+		return np.array([[host.getIPSAvailable(), host.getRAMAvailable()[0], host.getDiskAvailable()[0]] \
+			for host in self.hostlist], dtype=float).reshape(-1, 3)
+
+	def getContainerRequirements(self, containerIDs):
+		# IPS, RAM size and disk size required by each container, [containers x 3]
+		containers = [self.containerlist[cid] for cid in containerIDs]
+		return np.array([[container.getBaseIPS(), container.getRAM()[0], container.getDisk()[0]] \
+			for container in containers], dtype=float).reshape(-1, 3)
+
+	def getPlacementMatrix(self, containerIDs):
+		# getPlacementPossible of every container and host [containers x hosts]
+		# from one read of the current host and container usage
+		required, available = self.getContainerRequirements(containerIDs), self.getHostsAvailable()
+		return np.all(required[:, None, :] <= available[None, :, :], axis=2)
+
 	def addContainersInit(self, containerInfoListInit):
 		self.interval += 1
 		deployed = self.addContainerListInit(containerInfoListInit)
 		return deployed
 
 	def allocateInit(self, decision):
+		if self.stats: self.stats.savePrediction(decision)
 		start = time()
 		migrations = []
 		for (cid, hid) in decision:
@@ -123,6 +147,7 @@ class Framework():
 				container.allocateAndExecute(hid)
 			# destroy pointer to this unallocated container as book-keeping is done by workload model
 			else: 
+				del self.containersByCID[container.creationID]
 				self.containerlist[cid] = None
 		self.intervalAllocTimings.append(time() - start)
 		self.logger.debug("First allocation: "+str(decision))
@@ -171,6 +196,13 @@ class Framework():
 	def getContainersInHosts(self):
 		return [len(self.getContainersOfHost(host)) for host in range(self.hostlimit)]
 
+	def getHostPowers(self):
+		return self.powertable.powerFromCPU([host.getCPU() for host in self.hostlist])
+
+	def getHostPowersFromIPS(self, ips):
+		# Power of each host if it were to run ips (one value per host)
+		return self.powertable.powerFromCPU(np.minimum(100, 100 * (np.asarray(ips) / self.hostIPSCaps)))
+
 	def parallelizedFunc(self, i):
 		cid, hid = i
 		container = self.getContainerByID(cid)
@@ -189,6 +221,7 @@ class Framework():
 		print()
 
 	def simulationStep(self, decision):
+		if self.stats: self.stats.savePrediction(decision)
 		start = time()
 		migrations = []
 		containerIDsAllocated = []
@@ -204,7 +237,9 @@ class Framework():
 				migrations.append((cid, hid))
 		Parallel(n_jobs=num_cores, backend='threading')(delayed(self.parallelizedFunc)(i) for i in migrations)
 		for (cid, hid) in decision:
-			if self.containerlist[cid].hostid == -1: self.containerlist[cid] = None
+			if self.containerlist[cid].hostid == -1:
+				del self.containersByCID[self.containerlist[cid].creationID]
+				self.containerlist[cid] = None
 		self.intervalAllocTimings.append(time() - start)
 		self.logger.debug("Decision: "+str(decision))
 		self.logger.debug('Interval allocation time for interval '+str(self.interval)+' is '+str(self.intervalAllocTimings[-1]))
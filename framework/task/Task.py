@@ -87,6 +87,7 @@ class Task():
 
 	def allocateAndExecute(self, hostID):
 		# self.env.logger.debug("Allocating container "+self.json_body['fields']['name']+" to host "+self.env.getHostByID(hostID).ip)
+		self.env.updateContainerHost(self.id, self.hostid, hostID)
 		self.hostid = hostID
 		self.json_body["fields"]["Host_id"] = hostID
 		_, lastMigrationTime = self.env.controller.create(self.json_body, self.env.getHostByID(self.hostid).ip)
@@ -98,6 +99,7 @@ class Task():
 		# self.env.logger.debug("Migrating container "+self.json_body['fields']['name']+" from host "+self.getHost().ip+
 		# 	" to host "+self.env.getHostByID(hostID).ip)
 		cur_host_ip = self.getHost().ip
+		self.env.updateContainerHost(self.id, self.hostid, hostID)
 		self.hostid = hostID
 		tar_host_ip = self.getHost().ip
 		self.json_body["fields"]["Host_id"] = hostID
@@ -117,6 +119,7 @@ class Task():
 		self.json_body["tags"]["active"] = False
 		self.json_body["fields"]["Host_id"] = -1
 		self.destroyAt = self.env.interval
+		self.env.updateContainerHost(self.id, self.hostid, -1)
 		self.hostid = -1
 
 	def updateUtilizationMetrics(self, data):
@@ -169,7 +169,7 @@ for ylabel in yLabelsStatic:
 			d = np.array([i['numdestroyed'] for i in stats.metrics]) if stats else np.array([0])
 			Data[ylabel][model], CI[ylabel][model] = cost / float(np.sum(d)) if len(d) != 1 else 0, 0
 		if 'f' in env and ylabel == 'Number of completed tasks per application':
-			r = stats.allcontainerinfo[-1]['application'] if stats else []
+			r = stats.getAllContainerInfo()[-1]['application'] if stats else []
 			application = np.array(r)
 			total = []
 			for app in apps:
@@ -188,7 +188,7 @@ for ylabel in yLabelsStatic:
 			d2 = np.array([i['numdestroyed'] for i in stats.metrics]) if stats else np.array([1])
 			Data[ylabel][model], CI[ylabel][model] = np.mean(d[d2>0] - d1[d2>0]), mean_confidence_interval(d[d2>0] - d1[d2>0])
 		if 'f' in env and ylabel == 'Average Response Time (seconds) per application':
-			r = stats.allcontainerinfo[-1] if stats else {'start': [], 'destroy': [], 'application': []}
+			r = stats.getAllContainerInfo()[-1] if stats else {'start': [], 'destroy': [], 'application': []}
 			start, end, application = np.array(r['start']), np.array(r['destroy']), np.array(r['application'])
 			response_times, errors = [], []
 			for app in apps:
@@ -204,7 +204,7 @@ for ylabel in yLabelsStatic:
 			d = np.array([jains_fairness(np.array(i['ips'])) for i in stats.activecontainerinfo]) if stats else np.array([0])
 			Data[ylabel][model], CI[ylabel][model] = np.mean(d), mean_confidence_interval(d)
 		if 'f' in env and ylabel == 'Fairness per application':
-			r = stats.allcontainerinfo[-1] if stats else {'start': [], 'destroy': [], 'application': []}
+			r = stats.getAllContainerInfo()[-1] if stats else {'start': [], 'destroy': [], 'application': []}
 			start, end, application = np.array(r['start']), np.array(r['destroy']), np.array(r['application'])
 			response_times = []
 			for app in apps:
@@ -217,7 +217,7 @@ for ylabel in yLabelsStatic:
 			d2 = np.array([i['numdestroyed'] for i in stats.metrics]) if stats else np.array([1])
 			Data[ylabel][model], CI[ylabel][model] = np.sum(d[d2>0]*d2[d2>0]), 0
 		if 'f' in env and ylabel == 'Fraction of total SLA Violations':
-			r = stats.allcontainerinfo[-1] if stats else {'start': [], 'destroy': [], 'application': []}
+			r = stats.getAllContainerInfo()[-1] if stats else {'start': [], 'destroy': [], 'application': []}
 			start, end, application = np.array(r['start']), np.array(r['destroy']), np.array(r['application'])
 			violations, total = 0, 0
 			for app in apps:
@@ -226,7 +226,7 @@ for ylabel in yLabelsStatic:
 				total += len(response_times)
 			Data[ylabel][model], CI[ylabel][model] = violations / (total+0.01), 0
 		if 'f' not in env and ylabel == 'Fraction of total SLA Violations':
-			r = stats.allcontainerinfo[-1] if stats else {'start': [], 'destroy': []}
+			r = stats.getAllContainerInfo()[-1] if stats else {'start': [], 'destroy': []}
 			start, end = np.array(r['start']), np.array(r['destroy'])
 			violations, total = 0, 0
 			response_times = np.fmax(0, end[end!=-1] - start[end!=-1])
@@ -236,7 +236,7 @@ for ylabel in yLabelsStatic:
 			if 'GOBI*' == model: Data[ylabel][model], CI[ylabel][model] = 0.000, 0
 			if 'DQLCM' == model: Data[ylabel][model], CI[ylabel][model] = 0.056, 0
 		if 'f' in env and ylabel == 'Fraction of SLA Violations per application':
-			r = stats.allcontainerinfo[-1] if stats else {'start': [], 'destroy': [], 'application': []}
+			r = stats.getAllContainerInfo()[-1] if stats else {'start': [], 'destroy': [], 'application': []}
 			start, end, application = np.array(r['start']), np.array(r['destroy']), np.array(r['application'])
 			violations = []
 			for app in apps:
@@ -259,7 +259,7 @@ for ylabel in yLabelsStatic:
 			d = np.array([(np.average(i['waittime'])-1 if i != [] else 0) for i in stats.metrics]) if stats else np.array([0.])
 			Data[ylabel][model], CI[ylabel][model] = np.sum(d[d>0]), mean_confidence_interval(d[d>0])
 		if 'f' in env and ylabel == 'Average Wait Time (intervals)':
-			r = stats.allcontainerinfo[-1] if stats else {'start': [], 'create': [], 'application': []}
+			r = stats.getAllContainerInfo()[-1] if stats else {'start': [], 'create': [], 'application': []}
 			start, end, application = np.array(r['create']), np.array(r['start']), np.array(r['application'])
 			response_times, errors = [], []
 			response_time = np.fmax(0, end - start - 1)
@@ -268,7 +268,7 @@ for ylabel in yLabelsStatic:
 			errors = 0 if 'array' in str(type(er)) else er
 			Data[ylabel][model], CI[ylabel][model] = response_times, errors
 		if 'f' in env and ylabel == 'Average Wait Time (intervals) per application':
-			r = stats.allcontainerinfo[-1] if stats else {'start': [], 'create': [], 'application': []}
+			r = stats.getAllContainerInfo()[-1] if stats else {'start': [], 'create': [], 'application': []}
 			start, end, application = np.array(r['create']), np.array(r['start']), np.array(r['application'])
 			response_times, errors = [], []
 			for app in apps:
@@ -389,7 +389,7 @@ for ylabel in yLabelsStatic:
 			d2 = np.array([i['numdestroyed'] for i in stats.metrics]) if stats else np.array([1])
 			Data[ylabel][model], CI[ylabel][model] = np.maximum(0, d[d2>0] - d1[d2>0]), mean_confidence_interval(d[d2>0] - d1[d2>0])
 		if 'f' in env and ylabel == 'Average Response Time (seconds) per application':
-			r = stats.allcontainerinfo[-1] if stats else {'start': [], 'destroy': [], 'application': []}
+			r = stats.getAllContainerInfo()[-1] if stats else {'start': [], 'destroy': [], 'application': []}
 			start, end, application = np.array(r['start']), np.array(r['destroy']), np.array(r['application'])
 			response_times, errors = [], []
 			for app in apps:
@@ -407,7 +407,7 @@ for ylabel in yLabelsStatic:
 			d = np.array([(np.average(i['waittime'])-1 if i != [] else 0) for i in stats.metrics]) if stats else np.array([0.])
 			Data[ylabel][model], CI[ylabel][model] = d[d>0], mean_confidence_interval(d[d>0])
 		if 'f' in env and ylabel == 'Average Wait Time (intervals)':
-			r = stats.allcontainerinfo[-1] if stats else {'start': [], 'create': [], 'application': []}
+			r = stats.getAllContainerInfo()[-1] if stats else {'start': [], 'create': [], 'application': []}
 			start, end, application = np.array(r['create']), np.array(r['start']), np.array(r['application'])
 			response_times, errors = [], []
 			response_time = np.fmax(0, end - start - 1)
@@ -416,7 +416,7 @@ for ylabel in yLabelsStatic:
 			errors = 0 if 'array' in str(type(er)) else er
 			Data[ylabel][model], CI[ylabel][model] = response_times, errors
 		if 'f' in env and ylabel == 'Average Wait Time (intervals) per application':
-			r = stats.allcontainerinfo[-1] if stats else {'start': [], 'create': [], 'application': []}
+			r = stats.getAllContainerInfo()[-1] if stats else {'start': [], 'create': [], 'application': []}
 			start, end, application = np.array(r['create']), np.array(r['start']), np.array(r['application'])
 			response_times, errors = [], []
 			for app in apps:
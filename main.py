@@ -1,6 +1,9 @@
 import os, sys, stat
 import sys
 import optparse
+import importlib
+import inspect
+import random
 import logging as logger
 import configparser
 import pickle
@@ -27,51 +30,78 @@ from simulator.workload.BitbrainWorkload2 import *
 from simulator.workload.Azure2017Workload import *
 from simulator.workload.Azure2019Workload import *
 
-# Scheduler imports
-from scheduler.IQR_MMT_Random import IQRMMTRScheduler
-from scheduler.MAD_MMT_Random import MADMMTRScheduler
-from scheduler.MAD_MC_Random import MADMCRScheduler
-from scheduler.LR_MMT_Random import LRMMTRScheduler
-from scheduler.Random_Random_FirstFit import RFScheduler
-from scheduler.Random_Random_LeastFull import RLScheduler
-from scheduler.RLR_MMT_Random import RLRMMTRScheduler
-from scheduler.Threshold_MC_Random import TMCRScheduler
-from scheduler.Random_Random_Random import RandomScheduler
-from scheduler.HGP_LBFGS import HGPScheduler
-from scheduler.GA import GAScheduler
-from scheduler.GOBI import GOBIScheduler
-from scheduler.GOBI2 import GOBI2Scheduler
-from scheduler.DRL import DRLScheduler
-from scheduler.DQL import DQLScheduler
-from scheduler.POND import PONDScheduler
-from scheduler.SOGOBI import SOGOBIScheduler
-from scheduler.SOGOBI2 import SOGOBI2Scheduler
-from scheduler.HGOBI import HGOBIScheduler
-from scheduler.HGOBI2 import HGOBI2Scheduler
-from scheduler.HSOGOBI import HSOGOBIScheduler
-from scheduler.HSOGOBI2 import HSOGOBI2Scheduler
+# Schedulers by name: module, class and whether the scheduler takes the
+# model data type. They are imported when selected, so that a run does not
+# load the libraries (torch, sklearn, ...) of every other scheduler
+SCHEDULERS = {
+	'IQRMMTR': ('scheduler.IQR_MMT_Random', 'IQRMMTRScheduler', False),
+	'MADMMTR': ('scheduler.MAD_MMT_Random', 'MADMMTRScheduler', False),
+	'MADMCR': ('scheduler.MAD_MC_Random', 'MADMCRScheduler', False),
+	'LRMMTR': ('scheduler.LR_MMT_Random', 'LRMMTRScheduler', False),
+	'RF': ('scheduler.Random_Random_FirstFit', 'RFScheduler', False),
+	'RL': ('scheduler.Random_Random_LeastFull', 'RLScheduler', False),
+	'RM': ('scheduler.Random_Random_MaxFull', 'RMScheduler', False),
+	'RLRMMTR': ('scheduler.RLR_MMT_Random', 'RLRMMTRScheduler', False),
+	'TMCR': ('scheduler.Threshold_MC_Random', 'TMCRScheduler', False),
+	'TMMTR': ('scheduler.Threshold_MMT_Random', 'TMMTRScheduler', False),
+	'TMR': ('scheduler.Threshold_Max_Random', 'TMRScheduler', False),
+	'Random': ('scheduler.Random_Random_Random', 'RandomScheduler', False),
+	'HGP': ('scheduler.HGP_LBFGS', 'HGPScheduler', True),
+	'GA': ('scheduler.GA', 'GAScheduler', True),
+	'GOBI': ('scheduler.GOBI', 'GOBIScheduler', True),
+	'GOBI2': ('scheduler.GOBI2', 'GOBI2Scheduler', True),
+	'DRL': ('scheduler.DRL', 'DRLScheduler', True),
+	'DQL': ('scheduler.DQL', 'DQLScheduler', True),
+	'POND': ('scheduler.POND', 'PONDScheduler', True),
+	'SOGOBI': ('scheduler.SOGOBI', 'SOGOBIScheduler', True),
+	'SOGOBI2': ('scheduler.SOGOBI2', 'SOGOBI2Scheduler', True),
+	'HGOBI': ('scheduler.HGOBI', 'HGOBIScheduler', True),
+	'HGOBI2': ('scheduler.HGOBI2', 'HGOBI2Scheduler', True),
+	'HSOGOBI': ('scheduler.HSOGOBI', 'HSOGOBIScheduler', True),
+	'HSOGOBI2': ('scheduler.HSOGOBI2', 'HSOGOBI2Scheduler', True),
+}
+
+# Simulator workloads by name
+WORKLOADS = {
+	'BWGD2': BWGD2,
+	'Azure2017': Azure2017Workload,
+	'Azure2019': Azure2019Workload,
+}
 
 # Auxiliary imports
 from stats.Stats import *
 from utils.Utils import *
 from pdb import set_trace as bp
 
-usage = "usage: python main.py -e <environment> -m <mode> # empty environment run simulator"
+usage = "usage: python main.py -e <environment> -m <mode> -s <scheduler> # empty environment run simulator"
 
 parser = optparse.OptionParser(usage=usage)
 parser.add_option("-e", "--environment", action="store", dest="env", default="", 
 					help="Environment is AWS, Openstack, Azure, VLAN, Vagrant")
 parser.add_option("-m", "--mode", action="store", dest="mode", default="0", 
 					help="Mode is 0 (Create and destroy), 1 (Create), 2 (No op), 3 (Destroy)")
+parser.add_option("-s", "--scheduler", action="store", dest="scheduler", default="GOBI", 
+					help="Scheduler is one of " + ", ".join(SCHEDULERS))
+parser.add_option("-w", "--workload", action="store", dest="workload", default="BWGD2", 
+					help="Simulator workload is one of " + ", ".join(WORKLOADS))
+parser.add_option("--steps", action="store", dest="steps", default="100", 
+					help="Number of simulation intervals")
+parser.add_option("--seed", action="store", dest="seed", default=None, 
+					help="Seed of the random number generators")
+parser.add_option("--logdir", action="store", dest="logdir", default="logs", 
+					help="Directory to save results in")
+parser.add_option("--warmstart", action="store_true", dest="warmstart", default=False, 
+					help="Warm start the optimization of GOBI from the last interval")
 opts, args = parser.parse_args()
 
 # Global constants
-NUM_SIM_STEPS = 100
+NUM_SIM_STEPS = int(opts.steps)
 HOSTS = 10 * 5 if opts.env == '' else 10
 CONTAINERS = HOSTS
 TOTAL_POWER = 1000
 ROUTER_BW = 10000
 INTERVAL_TIME = 300 # seconds
+SCHEDULING_BUDGET = 30 # seconds, limit on scheduling time in framework mode
 NEW_CONTAINERS = 0 if HOSTS == 10 else 5
 DB_NAME = ''
 DB_HOST = ''
@@ -79,10 +109,30 @@ DB_PORT = 0
 HOSTS_IP = []
 logFile = 'COSCO.log'
 
-if len(sys.argv) > 1:
+if opts.env != '':
 	with open(logFile, 'w'): os.utime(logFile, None)
 
+def setSeed(seed):
+	random.seed(seed); np.random.seed(seed)
+	if 'torch' in sys.modules: sys.modules['torch'].manual_seed(seed)
+
+def loadScheduler(name):
+	if name not in SCHEDULERS:
+		raise ValueError("Unknown scheduler " + name + ", choose one of " + ", ".join(SCHEDULERS))
+	module, classname, datatype = SCHEDULERS[name]
+	scheduler = getattr(importlib.import_module(module), classname)
+	kwargs = {}
+	if opts.warmstart:
+		if 'WarmStart' not in inspect.signature(scheduler).parameters:
+			raise ValueError("Scheduler " + name + " does not support warm start")
+		kwargs['WarmStart'] = True
+	# Seed torch too if the scheduler imported it
+	if opts.seed is not None: setSeed(int(opts.seed))
+	return scheduler('energy_latency_'+str(HOSTS), **kwargs) if datatype else scheduler(**kwargs)
+
 def initalizeEnvironment(environment, logger):
+	if opts.seed is not None: setSeed(int(opts.seed))
+
 	if environment != '':
 		# Initialize the db
 		db = Database(DB_NAME, DB_HOST, DB_PORT)
@@ -95,15 +145,16 @@ def initalizeEnvironment(environment, logger):
 		datacenter = AzureFog(HOSTS)
 
 	# Initialize workload
-	''' Can be SWSD, BWGD2, Azure2017Workload, Azure2019Workload // DFW, AIoTW '''
+	''' Can be any name in WORKLOADS, selected with -w (default BWGD2) // DFW, AIoTW '''
 	if environment != '':
 		workload = DFW(NEW_CONTAINERS, 1.5, db)
 	else: 
-		workload = BWGD2(NEW_CONTAINERS, 1.5)
+		workload = WORKLOADS[opts.workload](NEW_CONTAINERS, 1.5)
 	
 	# Initialize scheduler
-	''' Can be LRMMTR, RF, RL, RM, Random, RLRMMTR, TMCR, TMMR, TMMTR, GA, GOBI (arg = 'energy_latency_'+str(HOSTS)) '''
-	scheduler = GOBIScheduler('energy_latency_'+str(HOSTS)) # GOBIScheduler('energy_latency_'+str(HOSTS))
+	''' Can be any name in SCHEDULERS, selected with -s (default GOBI) '''
+	scheduler = loadScheduler(opts.scheduler)
+	if environment != '': scheduler.setTimeBudget(SCHEDULING_BUDGET)
 
 	# Initialize Environment
 	hostlist = datacenter.generateHosts()
@@ -152,7 +203,7 @@ def stepSimulation(workload, scheduler, env, stats):
 	stats.saveStats(deployed, migrations, destroyed, selected, decision, schedulingTime)
 
 def saveStats(stats, datacenter, workload, env, end=True):
-	dirname = "logs/" + datacenter.__class__.__name__
+	dirname = opts.logdir + "/" + datacenter.__class__.__name__
 	dirname += "_" + workload.__class__.__name__
 	dirname += "_" + str(NUM_SIM_STEPS) 
 	dirname += "_" + str(HOSTS)
@@ -161,14 +212,15 @@ def saveStats(stats, datacenter, workload, env, end=True):
 	dirname += "_" + str(ROUTER_BW)
 	dirname += "_" + str(INTERVAL_TIME)
 	dirname += "_" + str(NEW_CONTAINERS)
-	if not os.path.exists("logs"): os.mkdir("logs")
+	os.makedirs(opts.logdir, exist_ok=True)
 	if os.path.exists(dirname): shutil.rmtree(dirname, ignore_errors=True)
 	os.mkdir(dirname)
 	stats.generateDatasets(dirname)
 	if 'Datacenter' in datacenter.__class__.__name__:
 		saved_env, saved_workload, saved_datacenter, saved_scheduler, saved_sim_scheduler = stats.env, stats.workload, stats.datacenter, stats.scheduler, stats.simulated_scheduler
 		stats.env, stats.workload, stats.datacenter, stats.scheduler, stats.simulated_scheduler = None, None, None, None, None
-		with open(dirname + '/' + dirname.split('/')[1] +'.pk', 'wb') as handle:
+		stats.recorder.save(dirname)
+		with open(dirname + '/' + os.path.basename(dirname) +'.pk', 'wb') as handle:
 		    pickle.dump(stats, handle)
 		stats.env, stats.workload, stats.datacenter, stats.scheduler, stats.simulated_scheduler = saved_env, saved_workload, saved_datacenter, saved_scheduler, saved_sim_scheduler
 	if not end: return
@@ -180,7 +232,8 @@ def saveStats(stats, datacenter, workload, env, end=True):
 		logger.getLogger().handlers.clear(); env.logger.getLogger().handlers.clear()
 		if os.path.exists(dirname+'/'+logFile): os.remove(dirname+'/'+logFile)
 		rename(logFile, dirname+'/'+logFile)
-	with open(dirname + '/' + dirname.split('/')[1] +'.pk', 'wb') as handle:
+	stats.recorder.save(dirname, move=True)
+	with open(dirname + '/' + os.path.basename(dirname) +'.pk', 'wb') as handle:
 	    pickle.dump(stats, handle)
 
 if __name__ == '__main__':
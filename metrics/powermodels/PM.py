@@ -1,4 +1,5 @@
 import math
+import numpy as np
 
 class PM():
 	def __init__(self):
@@ -13,4 +14,27 @@ class PM():
 		left = self.powerlist[index]
 		right = self.powerlist[index + 1 if cpu%10 != 0 else index]
 		alpha = (cpu / 10) - index
-		return alpha * right + (1 - alpha) * left
\ No newline at end of file
+		return alpha * right + (1 - alpha) * left
+
+class PowerTable():
+	# Power lists of all distinct host types stacked as rows, with the type
+	# index of every host, to get the power of all hosts in one call
+	def __init__(self, powermodels):
+		powerlists, hosttypes = [], []
+		for pm in powermodels:
+			if pm.powerlist not in powerlists: powerlists.append(pm.powerlist)
+			hosttypes.append(powerlists.index(pm.powerlist))
+		self.powerlists = np.array(powerlists, dtype=float)
+		self.hosttypes = np.array(hosttypes, dtype=int)
+
+	# cpu vector (one value per host) consumption in 100
+	def powerFromCPU(self, cpu):
+		return batchPowerFromCPU(self.powerlists, self.hosttypes, cpu)
+
+def batchPowerFromCPU(powerlists, hosttypes, cpu):
+	cpu = np.clip(np.asarray(cpu, dtype=float), 0, 100)
+	index = np.floor(cpu / 10).astype(int)
+	left = powerlists[hosttypes, index]
+	right = powerlists[hosttypes, np.minimum(index + 1, powerlists.shape[1] - 1)]
+	alpha = (cpu / 10) - index
+	return alpha * right + (1 - alpha) * left
@@ -1,8 +1,14 @@
 EPOCHS = 300
+BATCH_SIZE = 64
 MODEL_SAVE_PATH = 'checkpoints'
 
 POPULATION_SIZE = 100
+GOBI_RESTARTS = 8
 Coeff_Energy = 0.8
 Coeff_Latency = 0.2
 
-UCB_K = 5
\ No newline at end of file
+UCB_K = 5
+
+# Early stopping of opt/so_opt
+PATIENCE = 20
+TOLERANCE = 1e-4
\ No newline at end of file
@@ -1,65 +1,52 @@
 import random 
 import torch
+import torch.nn.functional as F
 import numpy as np
-from src.constants import *  
- 
-class Individual(object): 
-    def __init__(self, dataset, f, bounds, data_type, hosts, chromosome=[]): 
-        self.dataset = dataset
-        self.f = f
-        self.hosts = hosts
-        self.data_type = data_type
-        self.chromosome = torch.tensor(chromosome if chromosome != [] else random.choice(dataset)[0], dtype=torch.float)
-        self.fitness = self.cal_fitness() 
-        self.bounds = bounds
-  
-    def mate(self, par2): 
-        child_chromosome = [] 
-        for gp1, gp2 in zip(self.chromosome, par2.chromosome):       
-            prob = random.random() 
-            if prob < 0.45: 
-                child_chromosome.append(gp1) 
-            elif prob < 0.90: 
-                child_chromosome.append(gp2) 
-            else: 
-                child_chromosome.append(random.choice(self.dataset)[0][len(child_chromosome)]) 
-        alloc = []
-        for i in child_chromosome:
-            oneHot = [0] * self.hosts; alist = i.tolist()[-self.hosts:]
-            oneHot[alist.index(max(alist))] = 1; alloc.append(oneHot)
-        child_chromosome = np.concatenate((self.chromosome[:,0:-self.hosts], np.array(alloc)), axis=1)
-        return Individual(self.dataset, self.f, self.bounds, self.data_type, self.hosts, child_chromosome) 
-  
-    def cal_fitness(self): 
-        res = self.f(self.chromosome)
-        return res
-  
-def ga(dataset, f, bounds, data_type, hosts): 
+from time import time
+from src.constants import *
+
+def evaluate(f, cpu, population, hosts):
+    # Fitness of every individual (host index of each container) in one
+    # batched call of the surrogate
+    alloc = F.one_hot(population, hosts).to(cpu.dtype)
+    with torch.no_grad():
+        return f(torch.cat((cpu.expand(len(population), -1, -1), alloc), dim=-1)).reshape(-1)
+
+def mutate(population, mask, hosts):
+    population[mask] = torch.randint(0, hosts, (int(mask.sum()),))
+    return population
+
+def ga(init, f, bounds, data_type, hosts, deadline=None): 
+    # init is the current allocation [C, F + H], the initial population is
+    # that allocation with mutated genes (all but the first individual)
+    cpu = init[:, :-hosts]
+    population = init[:, -hosts:].argmax(dim=-1).repeat(POPULATION_SIZE, 1)
+    mask = torch.rand(population.shape) < 0.1; mask[0] = False
+    population = mutate(population, mask, hosts)
+    fitness = evaluate(f, cpu, population, hosts)
     generation = 1
-    population = [] 
     best_fitness = []
-  
-    for _ in range(POPULATION_SIZE): 
-        population.append(Individual(dataset, f, bounds, data_type, hosts)) 
+    elites, parents = int(0.1*POPULATION_SIZE), min(50, POPULATION_SIZE)
   
     while True: 
-        population = sorted(population, key = lambda x:x.fitness) 
-  
-        new_generation = [] 
-        new_generation.extend(population[:int(0.1*POPULATION_SIZE)]) 
-  
-        s = int(0.9*POPULATION_SIZE) 
-        for _ in range(s): 
-            parent1 = random.choice(population[:50]) 
-            parent2 = random.choice(population[:50]) 
-            child = parent1.mate(parent2) 
-            new_generation.append(child) 
-  
-        population = new_generation 
-  
-        best_fitness.append(population[0].fitness)
+        order = torch.argsort(fitness)
+        population, fitness = population[order], fitness[order]
+
+        best_fitness.append(fitness[0].item())
         if len(best_fitness) > 10 and best_fitness[-1] >= best_fitness[-2]: break
+        if deadline and time() > deadline: break
+
+        # Uniform crossover of parents from the fittest individuals, each
+        # gene taken from the first (0.45), second (0.45) or mutated (0.1)
+        s = POPULATION_SIZE - elites
+        parent1 = population[torch.randint(0, parents, (s,))]
+        parent2 = population[torch.randint(0, parents, (s,))]
+        prob = torch.rand(parent1.shape)
+        children = mutate(torch.where(prob < 0.45, parent1, parent2), prob >= 0.90, hosts)
+
+        population = torch.cat((population[:elites], children))
+        fitness = torch.cat((fitness[:elites], evaluate(f, cpu, children, hosts)))
         generation += 1
   
-    return population[0].chromosome, generation, population[0].fitness
-
+    result = torch.cat((cpu, F.one_hot(population[0], hosts).to(cpu.dtype)), dim=-1)
+    return result, generation, fitness[0]
@@ -3,8 +3,6 @@ import torch.nn as nn
 from .constants import *
 from .npn import *
 
-from sys import argv
-
 class energy_50(nn.Module):
     def __init__(self):
         super(energy_50, self).__init__()
@@ -20,14 +18,14 @@ class energy_50(nn.Module):
             nn.Sigmoid())
 
     def forward(self, x):
-        x = x.flatten()
-        x = self.find(x)
+        x = self.find(x.reshape(-1, 50 * 51)).reshape(x.shape[:-2] + (1,))
         return x
 
 class energy_latency_50(nn.Module):
     def __init__(self):
         super(energy_latency_50, self).__init__()
         self.name = "energy_latency_50"
+        self.scalarize = True
         self.find = nn.Sequential(
             nn.Linear(50 * 52, 128),
             nn.Softplus(),
@@ -39,16 +37,16 @@ class energy_latency_50(nn.Module):
             nn.Sigmoid())
 
     def forward(self, x):
-        x = x.flatten()
-        x = self.find(x)
-        if not('train' in argv[0] and 'train' in argv[2]):
-            x = Coeff_Energy*x[0] + Coeff_Latency*x[1]
+        x = self.find(x.reshape(-1, 50 * 52)).reshape(x.shape[:-2] + (2,))
+        if self.scalarize:
+            x = Coeff_Energy*x[..., 0] + Coeff_Latency*x[..., 1]
         return x
 
 class energy_latency_10(nn.Module):
     def __init__(self):
         super(energy_latency_10, self).__init__()
         self.name = "energy_latency_10"
+        self.scalarize = True
         self.find = nn.Sequential(
             nn.Linear(10 * 12, 128),
             nn.Softplus(),
@@ -60,16 +58,16 @@ class energy_latency_10(nn.Module):
             nn.Sigmoid())
 
     def forward(self, x):
-        x = x.flatten()
-        x = self.find(x)
-        if not('train' in argv[0] and 'train' in argv[2]):
-            x = Coeff_Energy*x[0] + Coeff_Latency*x[1]
+        x = self.find(x.reshape(-1, 10 * 12)).reshape(x.shape[:-2] + (2,))
+        if self.scalarize:
+            x = Coeff_Energy*x[..., 0] + Coeff_Latency*x[..., 1]
         return x
 
 class energy_latency2_10(nn.Module):
     def __init__(self):
         super(energy_latency2_10, self).__init__()
         self.name = "energy_latency2_10"
+        self.scalarize = True
         self.find = nn.Sequential(
             nn.Linear(10 * 14, 128),
             nn.Softplus(),
@@ -81,16 +79,16 @@ class energy_latency2_10(nn.Module):
             nn.Sigmoid())
 
     def forward(self, x):
-        x = x.flatten()
-        x = self.find(x)
-        if not('train' in argv[0] and 'train' in argv[2]):
-            x = Coeff_Energy*x[0] + Coeff_Latency*x[1]
+        x = self.find(x.reshape(-1, 10 * 14)).reshape(x.shape[:-2] + (2,))
+        if self.scalarize:
+            x = Coeff_Energy*x[..., 0] + Coeff_Latency*x[..., 1]
         return x
 
 class energy_latency2_50(nn.Module):
     def __init__(self):
         super(energy_latency2_50, self).__init__()
         self.name = "energy_latency2_50"
+        self.scalarize = True
         self.find = nn.Sequential(
             nn.Linear(50 * 54, 128),
             nn.Softplus(),
@@ -102,16 +100,16 @@ class energy_latency2_50(nn.Module):
             nn.Sigmoid())
 
     def forward(self, x):
-        x = x.flatten()
-        x = self.find(x)
-        if not('train' in argv[0] and 'train' in argv[2]):
-            x = Coeff_Energy*x[0] + Coeff_Latency*x[1]
+        x = self.find(x.reshape(-1, 50 * 54)).reshape(x.shape[:-2] + (2,))
+        if self.scalarize:
+            x = Coeff_Energy*x[..., 0] + Coeff_Latency*x[..., 1]
         return x
 
 class stochastic_energy_latency_50(nn.Module):
     def __init__(self):
         super(stochastic_energy_latency_50, self).__init__()
         self.name = "stochastic_energy_latency_50"
+        self.scalarize = True
         self.find = nn.Sequential(
             NPNLinear(50 * 52, 128, False),
             NPNRelu(),
@@ -123,9 +121,9 @@ class stochastic_energy_latency_50(nn.Module):
             NPNSigmoid())
 
     def forward(self, x):
-        x = x.reshape(1, -1)
+        x = x.reshape(-1, 50 * 52)
         x, s = self.find(x)
-        if not('train' in argv[0] and 'train' in argv[2]):
+        if self.scalarize:
             return x + UCB_K * s
         return x, s
 
@@ -133,6 +131,7 @@ class stochastic_energy_latency2_50(nn.Module):
     def __init__(self):
         super(stochastic_energy_latency2_50, self).__init__()
         self.name = "stochastic_energy_latency2_50"
+        self.scalarize = True
         self.find = nn.Sequential(
             NPNLinear(50 * 54, 128, False),
             NPNRelu(),
@@ -144,9 +143,9 @@ class stochastic_energy_latency2_50(nn.Module):
             NPNSigmoid())
 
     def forward(self, x):
-        x = x.reshape(1, -1)
+        x = x.reshape(-1, 50 * 54)
         x, s = self.find(x)
-        if not('train' in argv[0] and 'train' in argv[2]):
+        if self.scalarize:
             return x + UCB_K * s
         return x, s
 
@@ -154,6 +153,7 @@ class stochastic_energy_latency_10(nn.Module):
     def __init__(self):
         super(stochastic_energy_latency_10, self).__init__()
         self.name = "stochastic_energy_latency_10"
+        self.scalarize = True
         self.find = nn.Sequential(
             NPNLinear(10 * 12, 128, False),
             NPNRelu(),
@@ -165,9 +165,9 @@ class stochastic_energy_latency_10(nn.Module):
             NPNSigmoid())
 
     def forward(self, x):
-        x = x.reshape(1, -1)
+        x = x.reshape(-1, 10 * 12)
         x, s = self.find(x)
-        if not('train' in argv[0] and 'train' in argv[2]):
+        if self.scalarize:
             return x + UCB_K * s
         return x, s
 
@@ -175,6 +175,7 @@ class stochastic_energy_latency2_10(nn.Module):
     def __init__(self):
         super(stochastic_energy_latency2_10, self).__init__()
         self.name = "stochastic_energy_latency2_10"
+        self.scalarize = True
         self.find = nn.Sequential(
             NPNLinear(10 * 14, 128, False),
             NPNRelu(),
@@ -186,8 +187,19 @@ class stochastic_energy_latency2_10(nn.Module):
             NPNSigmoid())
 
     def forward(self, x):
-        x = x.reshape(1, -1)
+        x = x.reshape(-1, 10 * 14)
         x, s = self.find(x)
-        if not('train' in argv[0] and 'train' in argv[2]):
+        if self.scalarize:
             return x + UCB_K * s
-        return x, s
\ No newline at end of file
+        return x, s
+
+class compiled(nn.Module):
+    def __init__(self, module, name):
+        super(compiled, self).__init__()
+        self.name = name
+        self.module = module
+
+    def forward(self, x):
+        # The TorchScript module is traced on batches
+        y = self.module(x.reshape((-1,) + x.shape[-2:]))
+        return y.reshape(x.shape[:-2] + y.shape[1:])
@@ -1,51 +1,58 @@
 import random 
 import torch
 import numpy as np
-from copy import deepcopy
+from time import time
 from src.constants import *
 from src.adahessian import Adahessian
 import matplotlib.pyplot as plt
 
-def convertToOneHot(dat, cpu_old, HOSTS):
-    alloc = []
-    for i in dat:
-        oneHot = [0] * HOSTS; alist = i.tolist()[-HOSTS:]
-        oneHot[alist.index(max(alist))] = 1; alloc.append(oneHot)
-    new_dat_oneHot = torch.cat((cpu_old, torch.FloatTensor(alloc)), dim=1)
-    return new_dat_oneHot
+def convertToOneHot(dat, HOSTS):
+    # Project the allocation columns of dat in place to the one-hot of their
+    # first maximum
+    alloc = dat[..., -HOSTS:]
+    hosts = alloc.argmax(dim=-1, keepdim=True)
+    alloc.zero_().scatter_(-1, hosts, 1)
 
-def opt(init, model, bounds, data_type):
-    HOSTS = int(data_type.split('_')[-1])
-    optimizer = torch.optim.AdamW([init] , lr=0.8)
-    scheduler = torch.optim.lr_scheduler.CosineAnnealingLR(optimizer, T_max=10)
-    iteration = 0; equal = 0; z_old = 100; zs = []
+def restarts(init):
+    return init.data if init.dim() == 3 else init.data.unsqueeze(0)
+
+def descend(init, model, optimizer, scheduler, HOSTS, deadline=None, create_graph=False):
+    # init is one allocation [C, H+F] or K restarts [K, C, H+F] optimized
+    # together. Stops after PATIENCE steps in which no restart improved its
+    # best objective by more than TOLERANCE (or at the deadline) and returns
+    # the best allocation found by any restart
+    cpu = restarts(init)[..., :-HOSTS].clone()
+    convertToOneHot(restarts(init), HOSTS)
+    best = restarts(init).clone(); best_z = torch.full((len(best),), float('inf'))
+    iteration = 0; stall = 0
     while iteration < 200:
-        cpu_old = deepcopy(init.data[:,0:-HOSTS]); alloc_old = deepcopy(init.data[:,-HOSTS:])
         z = model(init)
-        optimizer.zero_grad(); z.backward(); optimizer.step(); scheduler.step()
-        init.data = convertToOneHot(init.data, cpu_old, HOSTS)
-        equal = equal + 1 if torch.all(alloc_old.eq(init.data[:,-HOSTS:])) else 0
-        if equal > 30: break
-        iteration += 1; z_old = z.item()
-    #     zs.append(z.item())
-    # plt.plot(zs); plt.show(); plt.clf()
-    init.requires_grad = False 
-    return init.data, iteration, model(init)
+        with torch.no_grad():
+            zs = z.detach().reshape(-1)
+            stall = 0 if torch.any(zs < best_z - TOLERANCE) else stall + 1
+            improved = zs < best_z
+            best[improved] = restarts(init)[improved]; best_z[improved] = zs[improved]
+        if stall >= PATIENCE: break
+        optimizer.zero_grad(); z.sum().backward(create_graph=create_graph); optimizer.step(); scheduler.step()
+        with torch.no_grad():
+            restarts(init)[..., :-HOSTS] = cpu
+            convertToOneHot(restarts(init), HOSTS)
+        iteration += 1
+        if deadline and time() > deadline: break
+    init.requires_grad = False
+    k = torch.argmin(best_z)
+    return best[k], iteration, best_z[k]
 
-def so_opt(init, model, bounds, data_type):
+def opt(init, model, bounds, data_type, deadline=None, optimizer=None, scheduler=None):
+    # A warm started caller passes the optimizer (over init) and learning
+    # rate scheduler it keeps across calls
+    HOSTS = int(data_type.split('_')[-1])
+    optimizer = optimizer or torch.optim.AdamW([init] , lr=0.8)
+    scheduler = scheduler or torch.optim.lr_scheduler.CosineAnnealingLR(optimizer, T_max=10)
+    return descend(init, model, optimizer, scheduler, HOSTS, deadline)
+
+def so_opt(init, model, bounds, data_type, deadline=None):
     HOSTS = int(data_type.split('_')[-1])
     optimizer = Adahessian([init] , lr=0.8)
     scheduler = torch.optim.lr_scheduler.CosineAnnealingLR(optimizer, T_max=10)
-    iteration = 0; equal = 0; z_old = 100; zs = []
-    while iteration < 200:
-        cpu_old = deepcopy(init.data[:,0:-HOSTS]); alloc_old = deepcopy(init.data[:,-HOSTS:])
-        z = model(init)
-        optimizer.zero_grad(); z.backward(create_graph=True); optimizer.step(); scheduler.step()
-        init.data = convertToOneHot(init.data, cpu_old, HOSTS)
-        equal = equal + 1 if torch.all(alloc_old.eq(init.data[:,-HOSTS:])) else 0
-        if equal > 30: break
-        iteration += 1; z_old = z.item()
-    #     zs.append(z.item())
-    # plt.plot(zs); plt.show(); plt.clf()
-    init.requires_grad = False 
-    return init.data, iteration, model(init)
\ No newline at end of file
+    return descend(init, model, optimizer, scheduler, HOSTS, deadline, create_graph=True)
@@ -1,9 +1,10 @@
 import matplotlib.pyplot as plt
 import os
-from src.constants import *
+from .constants import *
 import pandas as pd 
 import numpy as np
 import torch
+from torch.utils.data import TensorDataset
 import random
 import statistics
 
@@ -35,72 +36,79 @@ class color:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
+def one_hot(alloc, HOSTS):
+	# alloc[i][j] is the host of container j in row i (-1 if unallocated)
+	alloc = alloc.astype(int)
+	onehot = np.zeros(alloc.shape + (HOSTS,))
+	rows, containers = np.nonzero(alloc >= 0)
+	onehot[rows, containers, alloc[rows, containers]] = 1
+	return onehot
+
+def tensor_dataset(features, labels):
+	return TensorDataset(torch.tensor(features, dtype=torch.float), torch.tensor(labels, dtype=torch.float))
+
+def energy_latency_labels(data):
+	# Normalization by (x - min)/(max - min)
+	energy = (data[:, -2] - data.min(0)[-2])/(data.max(0)[-2] - data.min(0)[-2])
+	response = np.maximum(0, data[:, -1])/data.max(0)[-1]
+	return np.stack((energy, response), axis=1)
+
 def load_energy_data():
 	dataset_path = 'datasets/energy_scheduling.csv'
 	data = pd.read_csv(dataset_path) if os.path.exists(dataset_path) else pd.read_csv('scheduler/BaGTI/'+dataset_path)
-	data = data.values.astype(np.float)
-	dataset = []
+	data = data.values.astype(float)
 	print("Dataset size", data.shape[0])
-	for i in range(data.shape[0]):
-		cpu, alloc = [], []
-		for j in range(50):
-			cpu.append(data[i][j]/100)
-			oneHot = [0] * 50
-			if int(data[i][j+50]) >= 0: oneHot[int(data[i][j+50])] = 1
-			alloc.append(oneHot)
-		cpu = np.array([cpu]).transpose()
-		alloc = np.array(alloc)
-		dataset.append(((np.concatenate((cpu, alloc), axis=1)), torch.Tensor([(data[i][-1]- 9800)/9000])))
-		# Normalization by (x - min)/(max - min)
+	cpu = data[:, :50, None]/100
+	alloc = one_hot(data[:, 50:100], 50)
+	dataset = tensor_dataset(np.concatenate((cpu, alloc), axis=2), (data[:, -1:] - 9800)/9000)
 	return dataset, len(dataset)
 
 def load_energy_latency_data(HOSTS):
 	dataset_path = 'datasets/energy_latency_'+str(HOSTS)+'_scheduling.csv'
 	data = pd.read_csv(dataset_path) if os.path.exists(dataset_path) else pd.read_csv('scheduler/BaGTI/'+dataset_path)
-	data = data.values.astype(np.float)
-	max_ips_container = max(data.max(0)[HOSTS:2*HOSTS])
-	dataset = []
+	data = data.values.astype(float)
+	max_ips_container = float(max(data.max(0)[HOSTS:2*HOSTS]))
 	print("Dataset size", data.shape[0])
-	for i in range(data.shape[0]):
-		cpuH, cpuC, alloc = [], [], []
-		for j in range(HOSTS):
-			cpuH.append(data[i][j]/100)
-			cpuC.append(data[i][j+HOSTS]/max_ips_container)
-			oneHot = [0] * HOSTS
-			if int(data[i][j+(2*HOSTS)]) >= 0: oneHot[int(data[i][j+(2*HOSTS)])] = 1
-			alloc.append(oneHot)
-		cpuH = np.array([cpuH]).transpose(); cpuC = np.array([cpuC]).transpose()
-		alloc = np.array(alloc)
-		dataset.append(((np.concatenate((cpuH, cpuC, alloc), axis=1)), torch.Tensor([(data[i][-2]- data.min(0)[-2])/(data.max(0)[-2] - data.min(0)[-2]), max(0, data[i][-1])/data.max(0)[-1]])))
-		if dataset[-1][1][1] > 1:
-			print(dataset[-1])
-		# Normalization by (x - min)/(max - min)
+	cpuH = data[:, :HOSTS, None]/100
+	cpuC = data[:, HOSTS:2*HOSTS, None]/max_ips_container
+	alloc = one_hot(data[:, 2*HOSTS:3*HOSTS], HOSTS)
+	dataset = tensor_dataset(np.concatenate((cpuH, cpuC, alloc), axis=2), energy_latency_labels(data))
 	return dataset, len(dataset), max_ips_container
 
 def load_energy_latency2_data(HOSTS):
 	dataset_path = 'datasets/energy_latency2_'+str(HOSTS)+'_scheduling.csv'
 	data = pd.read_csv(dataset_path, header=None) if os.path.exists(dataset_path) else pd.read_csv('scheduler/BaGTI/'+dataset_path, header=None)
-	data = data.values.astype(np.float)
-	max_ips_container = max(data.max(0)[HOSTS:2*HOSTS])
-	max_energy = data.max(0)[3*HOSTS]
-	max_response = data.max(0)[3*HOSTS+1]
-	dataset = []
+	data = data.values.astype(float)
+	max_ips_container = float(max(data.max(0)[HOSTS:2*HOSTS]))
+	max_energy = float(data.max(0)[3*HOSTS])
+	max_response = float(data.max(0)[3*HOSTS+1])
 	print("Dataset size", data.shape[0])
-	for i in range(data.shape[0]):
-		cpuH, cpuC, alloc = [], [], []
-		for j in range(HOSTS):
-			cpuH.append(data[i][j]/100)
-			cpuC.append(data[i][j+HOSTS]/max_ips_container)
-			oneHot = [0] * HOSTS
-			if int(data[i][j+(2*HOSTS)]) >= 0: oneHot[int(data[i][j+(2*HOSTS)])] = 1
-			alloc.append(oneHot)
-		cpuH = np.array([cpuH]).transpose(); cpuC = np.array([cpuC]).transpose()
-		alloc = np.array(alloc)
-		pred_vals = np.broadcast_to(np.array([data[i][3*HOSTS]/max_energy, data[i][3*HOSTS+1]/max_response]), (HOSTS, 2))
-		dataset.append(((np.concatenate((cpuH, cpuC, alloc, pred_vals), axis=1)), torch.Tensor([(data[i][-2]- data.min(0)[-2])/(data.max(0)[-2] - data.min(0)[-2]), max(0, data[i][-1])/data.max(0)[-1]])))
-		# Normalization by (x - min)/(max - min)
+	cpuH = data[:, :HOSTS, None]/100
+	cpuC = data[:, HOSTS:2*HOSTS, None]/max_ips_container
+	alloc = one_hot(data[:, 2*HOSTS:3*HOSTS], HOSTS)
+	pred_vals = np.stack((data[:, 3*HOSTS]/max_energy, data[:, 3*HOSTS+1]/max_response), axis=1)
+	pred_vals = np.broadcast_to(pred_vals[:, None, :], (data.shape[0], HOSTS, 2))
+	dataset = tensor_dataset(np.concatenate((cpuH, cpuC, alloc, pred_vals), axis=2), energy_latency_labels(data))
 	return dataset, len(dataset), (max_ips_container, max_energy, max_response)
 
+def normalization_dataset(data_type):
+	# Dataset the normalization constants of a model are read from
+	dataset_path = 'datasets/'+data_type.replace('stochastic_', '')+'_scheduling.csv'
+	return dataset_path if os.path.exists(dataset_path) else 'scheduler/BaGTI/'+dataset_path
+
+def normalization_constants(data_type):
+	# Constants returned by the data loader of a model, read from the column
+	# maxima of its dataset without building the dataset
+	dtl = data_type.replace('stochastic_', '').split('_')
+	HOSTS = int(dtl[-1]); latency2 = dtl[-2] == 'latency2'
+	header = None if latency2 else 'infer'
+	data = pd.read_csv(normalization_dataset(data_type), header=header)
+	data = data.values.astype(float).max(0)
+	max_ips_container = float(max(data[HOSTS:2*HOSTS]))
+	if latency2:
+		return (max_ips_container, float(data[3*HOSTS]), float(data[3*HOSTS+1]))
+	return max_ips_container
+
 def load_stochastic_energy_latency_data(HOSTS):
 	return load_energy_latency_data(HOSTS)
 
@@ -4,7 +4,9 @@ from .src.models import *
 from .src.ga import *
 from .src.opt import *
 
+from torch.utils.data import DataLoader, random_split
 from sys import argv, maxsize
+import json
 from time import time
 
 import warnings
@@ -12,42 +14,37 @@ warnings.filterwarnings("ignore")
 
 def custom_loss(y_pred, y_true, model_name):
 	if 'stochastic' in model_name:
-		return KL_loss(y_pred, Coeff_Energy*y_true[0] + Coeff_Latency*y_true[1])
+		label = Coeff_Energy*y_true[..., 0] + Coeff_Latency*y_true[..., 1]
+		return KL_loss(y_pred, label.reshape(y_pred[0].shape))
 	return torch.sum((y_pred - y_true) ** 2)
 
 def backprop(dataset, model, optimizer):
 	total = 0
-	for feat in dataset:
-		feature = feat[0]
-		feature = torch.tensor(feature,dtype=torch.float)
+	for feature, y_true in DataLoader(dataset, batch_size=BATCH_SIZE, shuffle=True):
 		y_pred = model(feature)
-		y_true = feat[1]
-		# print(y_pred, y_true)
 		optimizer.zero_grad()
 		loss = custom_loss(y_pred, y_true, model.name)
-		loss.backward()
+		(loss / len(feature)).backward()
 		optimizer.step()
-		total += loss
+		total += loss.item()
 	return total/len(dataset)
 
 def accuracy(dataset, model):
 	total = 0
-	for feat in dataset:
-		feature = feat[0]
-		feature = torch.tensor(feature,dtype=torch.float)
-		y_pred = model(feature)
-		y_true = feat[1]
-		loss = custom_loss(y_pred, y_true, model.name)
-		total += loss
+	with torch.no_grad():
+		for feature, y_true in DataLoader(dataset, batch_size=BATCH_SIZE):
+			y_pred = model(feature)
+			total += custom_loss(y_pred, y_true, model.name).item()
 	return total/len(dataset)
 
-def save_model(model, optimizer, epoch, accuracy_list):
+def save_model(model, optimizer, epoch, accuracy_list, normalization=None):
 	file_path = MODEL_SAVE_PATH + "/" + model.name + "_" + str(epoch) + ".ckpt"
 	torch.save({
         'epoch': epoch,
         'model_state_dict': model.state_dict(),
         'optimizer_state_dict': optimizer.state_dict(),
-        'accuracy_list': accuracy_list}, file_path)
+        'accuracy_list': accuracy_list,
+        'normalization': normalization}, file_path)
 
 def load_model(filename, model, data_type):
 	optimizer = torch.optim.Adam(model.parameters() , lr=0.0001, weight_decay=1e-5) if 'stochastic' not in data_type else torch.optim.AdamW(model.parameters() , lr=0.0001)
@@ -66,39 +63,87 @@ def load_model(filename, model, data_type):
 		print(color.GREEN+"Creating new model: "+model.name+color.ENDC)
 	return model, optimizer, epoch, accuracy_list
 
+def load_normalization(data_type):
+	# Normalization constants of the model inputs (as returned by its data
+	# loader), saved with the checkpoint or in a sidecar file computed from
+	# the dataset. The sidecar records the modification time and size of
+	# the dataset and is computed again when they change
+	file_path1 = MODEL_SAVE_PATH + "/" + data_type + "_Trained.ckpt"
+	file_path2 = 'scheduler/BaGTI/' + file_path1
+	file_path = file_path1 if os.path.exists(file_path1) else file_path2
+	if os.path.exists(file_path):
+		normalization = torch.load(file_path).get('normalization')
+		if normalization is not None: return normalization
+	sidecar = file_path.replace("_Trained.ckpt", "_normalization.json")
+	dataset = normalization_dataset(data_type)
+	stamp = [os.path.getmtime(dataset), os.path.getsize(dataset)] if os.path.exists(dataset) else None
+	if os.path.exists(sidecar):
+		with open(sidecar) as f: saved = json.load(f)
+		if isinstance(saved, dict) and (stamp is None or saved['dataset'] == stamp):
+			normalization = saved['normalization']
+			return tuple(normalization) if isinstance(normalization, list) else normalization
+	normalization = normalization_constants(data_type)
+	if os.path.exists(os.path.dirname(sidecar)):
+		# Write to a temporary file first so that runs loading the same
+		# model in parallel never read a partial file
+		temp = sidecar + '.' + str(os.getpid()) + '.tmp'
+		with open(temp, 'w') as f: json.dump({'dataset': stamp, 'normalization': normalization}, f)
+		os.replace(temp, sidecar)
+	return normalization
+
+def export_model(model, dataset):
+	# TorchScript copy of the model in inference mode, which schedulers use
+	# in place of the checkpoint (gradients to the input still flow)
+	model.eval()
+	traced = torch.jit.freeze(torch.jit.trace(model, dataset.tensors[0][:BATCH_SIZE]))
+	file_path = MODEL_SAVE_PATH + "/" + model.name + "_Trained.pt"
+	torch.jit.save(traced, file_path)
+	print(color.GREEN+"Exported model: "+file_path+color.ENDC)
+
+def load_compiled(model):
+	file_path1 = MODEL_SAVE_PATH + "/" + model.name + "_Trained.pt"
+	file_path2 = 'scheduler/BaGTI/' + file_path1
+	file_path = file_path1 if os.path.exists(file_path1) else file_path2
+	if os.path.exists(file_path):
+		print(color.GREEN+"Loading compiled model: "+model.name+color.ENDC)
+		return compiled(torch.jit.load(file_path), model.name)
+	return model
+
 if __name__ == '__main__':
 	data_type = argv[1] # can be 'energy', 'energy_latency', 'energy_latency2', 'stochastic_energy_latency', 'stochastic_energy_latency2' + '_' + str(HOSTS)
-	exec_type = argv[2] # can be 'train', ga', 'opt'
+	exec_type = argv[2] # can be 'train', ga', 'opt', 'export'
 
 	model = eval(data_type+"()")
 	model, optimizer, start_epoch, accuracy_list = load_model(data_type, model, data_type)
+	# Train on both objectives, optimize their weighted sum
+	if hasattr(model, 'scalarize'): model.scalarize = exec_type != "train"
 	dtl = data_type.split('_')
-	dataset, dataset_size, _ = eval("load_"+'_'.join(dtl[:-1])+"_data("+dtl[-1]+")")
+	dataset, dataset_size, normalization = eval("load_"+'_'.join(dtl[:-1])+"_data("+dtl[-1]+")")
 
 	if exec_type == "train":
 		split = int(0.8 * dataset_size)
 
 		for epoch in range(start_epoch+1, start_epoch+EPOCHS+1):
 			print('EPOCH', epoch)
-			random.shuffle(dataset)
-			trainset = dataset[:split]
-			validation = dataset[split:]
-			loss = backprop(trainset, model, optimizer)
-			trainAcc, testAcc = float(loss.data), float(accuracy(validation, model).data)
+			trainset, validation = random_split(dataset, [split, dataset_size - split])
+			trainAcc = backprop(trainset, model, optimizer)
+			testAcc = accuracy(validation, model)
 			accuracy_list.append((testAcc, trainAcc))
 			print("Loss on train, test =", trainAcc, testAcc)
 			if epoch % 10 == 0:
-				save_model(model, optimizer, epoch, accuracy_list)
+				save_model(model, optimizer, epoch, accuracy_list, normalization)
 		print ("The minimum loss on test set is ", str(min(accuracy_list)), " at epoch ", accuracy_list.index(min(accuracy_list)))
 
 		plot_accuracies(accuracy_list, data_type)
+	elif exec_type == "export":
+		export_model(model, dataset)
 	else:
 		print(model.find); start = time()
 		for param in model.parameters(): param.requires_grad = False
-		init = torch.tensor(random.choice(dataset)[0], dtype=torch.float, requires_grad=True)
+		init = random.choice(dataset)[0].clone().requires_grad_(True)
 
 		if exec_type == "ga":
-			result, iteration, fitness = ga(dataset, model, [], data_type)
+			result, iteration, fitness = ga(init.detach(), model, [], data_type, int(dtl[-1]))
 		elif exec_type == "opt":
 			result, iteration, fitness = opt(init, model, [], data_type)
 		print("Time", time()-start)
@@ -9,12 +9,13 @@ class GAScheduler(Scheduler):
 		super().__init__()
 		self.model = eval(data_type+"()")
 		self.model, _, _, _ = load_model(data_type, self.model, data_type)
+		self.model = load_compiled(self.model)
 		self.hosts = int(data_type.split('_')[-1])
 		self.data_type = data_type
-		dtl = data_type.split('_')
-		self.dataset, self.dataset_size, self.max_container_ips = eval("load_"+'_'.join(dtl[:-1])+"_data("+dtl[-1]+")")
+		self.max_container_ips = load_normalization(data_type)
 
 	def run_GA(self):
+		deadline = self.getDeadline()
 		cpu = [host.getCPU()/100 for host in self.env.hostlist]
 		cpu = np.array([cpu]).transpose()
 		if 'latency' in self.model.name:
@@ -29,8 +30,9 @@ class GAScheduler(Scheduler):
 			else: oneHot[np.random.randint(0,len(self.env.hostlist))] = 1
 			alloc.append(oneHot)
 		init = np.concatenate((cpu, alloc), axis=1)
-		init = torch.tensor(init, dtype=torch.float, requires_grad=True)
-		result, iteration, fitness = ga(self.dataset, self.model, [], self.data_type, self.hosts)
+		init = torch.tensor(init, dtype=torch.float)
+		result, iteration, fitness = ga(init, self.model, [], self.data_type, self.hosts, deadline)
+		self.iterations, self.objective = iteration, float(fitness)
 		decision = []
 		for cid in prev_alloc:
 			one_hot = result[cid, (2 if 'latency' in self.model.name else 1):].tolist()
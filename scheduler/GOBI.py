@@ -5,16 +5,21 @@ from .Scheduler import *
 from .BaGTI.train import *
 
 class GOBIScheduler(Scheduler):
-	def __init__(self, data_type):
+	def __init__(self, data_type, WarmStart=False):
 		super().__init__()
+		# Warm start keeps the optimized allocations and optimizer state of
+		# the last interval
+		self.warmstart = WarmStart
+		self.param = None; self.creationIDs = None
 		self.model = eval(data_type+"()")
 		self.model, _, _, _ = load_model(data_type, self.model, data_type)
+		self.model = load_compiled(self.model)
 		self.data_type = data_type
 		self.hosts = int(data_type.split('_')[-1])
-		dtl = data_type.split('_')
-		_, _, self.max_container_ips = eval("load_"+'_'.join(dtl[:-1])+"_data("+dtl[-1]+")")
+		self.max_container_ips = load_normalization(data_type)
 
 	def run_GOBI(self):
+		deadline = self.getDeadline()
 		cpu = [host.getCPU()/100 for host in self.env.hostlist]
 		cpu = np.array([cpu]).transpose()
 		if 'latency' in self.model.name:
@@ -28,9 +33,18 @@ class GOBIScheduler(Scheduler):
 			if c and c.getHostID() != -1: oneHot[c.getHostID()] = 1
 			else: oneHot[np.random.randint(0,len(self.env.hostlist))] = 1
 			alloc.append(oneHot)
-		init = np.concatenate((cpu, alloc), axis=1)
-		init = torch.tensor(init, dtype=torch.float, requires_grad=True)
-		result, iteration, fitness = opt(init, self.model, [], self.data_type)
+		# Optimize the current allocation along with random restarts
+		restarts = [np.concatenate((cpu, alloc), axis=1)]
+		for _ in range(GOBI_RESTARTS - 1):
+			hosts = np.random.randint(0, len(self.env.hostlist), len(self.env.containerlist))
+			restarts.append(np.concatenate((cpu, np.eye(len(self.env.hostlist))[hosts]), axis=1))
+		init = torch.tensor(np.array(restarts), dtype=torch.float, requires_grad=True)
+		if self.warmstart:
+			init = self.warmStart(init)
+			result, iteration, fitness = opt(init, self.model, [], self.data_type, deadline, self.optimizer, self.lr_scheduler)
+		else:
+			result, iteration, fitness = opt(init, self.model, [], self.data_type, deadline)
+		self.iterations, self.objective = iteration, float(fitness)
 		decision = []
 		for cid in prev_alloc:
 			one_hot = result[cid, -self.hosts:].tolist()
@@ -38,6 +52,26 @@ class GOBIScheduler(Scheduler):
 			if prev_alloc[cid] != new_host: decision.append((cid, new_host))
 		return decision
 
+	def warmStart(self, init):
+		# Continue from the last optimized tensor with current host and
+		# container utilizations. Rows of containers created or destroyed
+		# since then start from init, with their optimizer moments cleared
+		creationIDs = [c.creationID if c else None for c in self.env.containerlist]
+		if self.param is None or self.param.shape != init.shape:
+			self.param = init
+			self.optimizer = torch.optim.AdamW([self.param], lr=0.8)
+			self.lr_scheduler = torch.optim.lr_scheduler.CosineAnnealingLR(self.optimizer, T_max=10)
+		else:
+			changed = [i for i, cid in enumerate(creationIDs) if cid != self.creationIDs[i]]
+			with torch.no_grad():
+				self.param[..., :-self.hosts] = init[..., :-self.hosts]
+				self.param[:, changed] = init[:, changed]
+			for moment in self.optimizer.state[self.param].values():
+				if torch.is_tensor(moment) and moment.shape == self.param.shape: moment[:, changed] = 0
+			self.param.requires_grad = True
+		self.creationIDs = creationIDs
+		return self.param
+
 	def selection(self):
 		return []
 
@@ -3,30 +3,41 @@ import numpy as np
 from copy import deepcopy
 from .hgp_constants import *
 from scipy import optimize
+from time import time
 import warnings
 warnings.filterwarnings("ignore")
 
 gmodel = None
+gdeadline = None
+
+class DeadlineExceeded(Exception):
+    pass
 
 def convertToOneHot(dat, cpu_old, HOSTS):
-    alloc = []
-    for i in dat:
-        oneHot = [0] * HOSTS; alist = i.tolist()[-HOSTS:]
-        oneHot[alist.index(max(alist))] = 1; alloc.append(oneHot)
-    new_dat_oneHot = np.concatenate((cpu_old, np.array(alloc)), axis=1)
+    alloc = np.zeros((len(dat), HOSTS))
+    alloc[np.arange(len(dat)), np.argmax(dat[:, -HOSTS:], axis=1)] = 1
+    new_dat_oneHot = np.concatenate((cpu_old, alloc), axis=1)
     return new_dat_oneHot
 
 def f(inp):
+    if gdeadline and time() > gdeadline: raise DeadlineExceeded
     x, s = gmodel.predict(inp.reshape(1,-1), return_std=True)
     return (x + UCB_K * s)[0]
 
-def HGPopt(init, model, data_type):
-    global gmodel
-    gmodel = model
+def HGPopt(init, model, data_type, deadline=None):
+    global gmodel, gdeadline
+    gmodel, gdeadline = model, deadline
     HOSTS = int(data_type.split('_')[-1])
     init = init.reshape(HOSTS, HOSTS+2)
-    cpu_old = deepcopy(init[:,0:-HOSTS]); alloc_old = deepcopy(init[:,-HOSTS:])
-    init = optimize.minimize(f, x0=init.reshape(-1), tol=100, method='BFGS', options={'maxiter':1}).x
+    cpu_old = deepcopy(init[:,0:-HOSTS])
+    iteration = 0
+    try:
+        init = optimize.minimize(f, x0=init.reshape(-1), tol=100, method='BFGS', options={'maxiter':1}).x
+        iteration = 1
+    except DeadlineExceeded:
+        # Keep the initial allocation
+        pass
+    gdeadline = None
     init = init.reshape(HOSTS, HOSTS+2)
     init = convertToOneHot(init, cpu_old, HOSTS)
-    return init, f(init)
+    return init, iteration, f(init)
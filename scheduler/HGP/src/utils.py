@@ -7,6 +7,7 @@ import random
 import statistics
 
 from sys import argv
+from scheduler.BaGTI.src.utils import one_hot
 
 class color:
     HEADER = '\033[95m'
@@ -21,22 +22,14 @@ class color:
 def load_energy_latency_data(HOSTS):
 	dataset_path = '../BaGTI/datasets/energy_latency_'+str(HOSTS)+'_scheduling.csv'
 	data = pd.read_csv(dataset_path) if os.path.exists(dataset_path) else pd.read_csv('scheduler/BaGTI/'+dataset_path)
-	data = data.values.astype(np.float)
+	data = data.values.astype(float)
 	max_ips_container = max(data.max(0)[HOSTS:2*HOSTS])
-	dataset = []
 	print("Dataset size", data.shape[0])
-	for i in range(data.shape[0]):
-		cpuH, cpuC, alloc = [], [], []
-		for j in range(HOSTS):
-			cpuH.append(data[i][j]/100)
-			cpuC.append(data[i][j+HOSTS]/max_ips_container)
-			oneHot = [0] * HOSTS
-			if int(data[i][j+(2*HOSTS)]) >= 0: oneHot[int(data[i][j+(2*HOSTS)])] = 1
-			alloc.append(oneHot)
-		cpuH = np.array([cpuH]).transpose(); cpuC = np.array([cpuC]).transpose()
-		alloc = np.array(alloc)
-		dataset.append(((np.concatenate((cpuH, cpuC, alloc), axis=1)), np.array([(data[i][-2]- data.min(0)[-2])/(data.max(0)[-2] - data.min(0)[-2]), max(0, data[i][-1])/data.max(0)[-1]])))
-		if dataset[-1][1][1] > 1:
-			print(dataset[-1])
-		# Normalization by (x - min)/(max - min)
+	cpuH = data[:, :HOSTS, None]/100
+	cpuC = data[:, HOSTS:2*HOSTS, None]/max_ips_container
+	alloc = one_hot(data[:, 2*HOSTS:3*HOSTS], HOSTS)
+	features = np.concatenate((cpuH, cpuC, alloc), axis=2)
+	# Normalization by (x - min)/(max - min)
+	labels = np.stack(((data[:, -2] - data.min(0)[-2])/(data.max(0)[-2] - data.min(0)[-2]), np.maximum(0, data[:, -1])/data.max(0)[-1]), axis=1)
+	dataset = list(zip(features, labels))
 	return dataset, len(dataset), max_ips_container
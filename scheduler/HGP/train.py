@@ -56,6 +56,6 @@ if __name__ == '__main__':
         x, s = gp_heteroscedastic.predict(init.reshape(1, -1), return_std=True)
         print((x + UCB_K * s)[0])
         start = time()
-        result, fitness = HGPopt(init, gp_heteroscedastic, data_type)
+        result, iteration, fitness = HGPopt(init, gp_heteroscedastic, data_type)
         print("Time", time()-start)
-        print("Iteration: {}\nResult: {}\nFitness: {}".format(0, result, fitness)) 
+        print("Iteration: {}\nResult: {}\nFitness: {}".format(iteration, result, fitness)) 
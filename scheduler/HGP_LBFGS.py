@@ -12,6 +12,7 @@ class HGPScheduler(Scheduler):
 		self.hosts = int(data_type.split('_')[-1])
 
 	def run_HGP(self):
+		deadline = self.getDeadline()
 		cpu = [host.getCPU()/100 for host in self.env.hostlist]
 		cpu = np.array([cpu]).transpose()
 		cpuC = [(c.getApparentIPS()/self.max_container_ips if c else 0) for c in self.env.containerlist]
@@ -25,7 +26,8 @@ class HGPScheduler(Scheduler):
 			else: oneHot[np.random.randint(0,len(self.env.hostlist))] = 1
 			alloc.append(oneHot)
 		init = np.concatenate((cpu, alloc), axis=1)
-		result, fitness = HGPopt(init, self.model, self.data_type)
+		result, iteration, fitness = HGPopt(init, self.model, self.data_type, deadline)
+		self.iterations, self.objective = iteration, float(fitness)
 		decision = []
 		for cid in prev_alloc:
 			one_hot = result[cid, -self.hosts:].tolist()
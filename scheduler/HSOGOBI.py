@@ -11,12 +11,13 @@ class HSOGOBIScheduler(Scheduler):
 		data_type = 'stochastic_' + data_type
 		self.model = eval(data_type+"()")
 		self.model, _, _, _ = load_model(data_type, self.model, data_type)
+		self.model = load_compiled(self.model)
 		self.data_type = data_type
 		self.hosts = int(data_type.split('_')[-1])
-		dtl = data_type.split('_')
-		_, _, self.max_container_ips = eval("load_"+'_'.join(dtl[:-1])+"_data("+dtl[-1]+")")
+		self.max_container_ips = load_normalization(data_type)
 
 	def run_HSOGOBI(self):
+		deadline = self.getDeadline()
 		cpu = [host.getCPU()/100 for host in self.env.hostlist]
 		cpu = np.array([cpu]).transpose()
 		if 'latency' in self.model.name:
@@ -32,7 +33,8 @@ class HSOGOBIScheduler(Scheduler):
 			alloc.append(oneHot)
 		init = np.concatenate((cpu, alloc), axis=1)
 		init = torch.tensor(init, dtype=torch.float, requires_grad=True)
-		result, iteration, fitness = so_opt(init, self.model, [], self.data_type)
+		result, iteration, fitness = so_opt(init, self.model, [], self.data_type, deadline)
+		self.iterations, self.objective = iteration, float(fitness)
 		decision = []
 		for cid in prev_alloc:
 			one_hot = result[cid, -self.hosts:].tolist()
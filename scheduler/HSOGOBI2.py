@@ -13,17 +13,19 @@ class HSOGOBI2Scheduler(Scheduler):
 		data_type = '_'.join(dtl[:-1])+'2_'+dtl[-1]
 		self.model = eval(data_type+"()")
 		self.model, _, _, _ = load_model(data_type, self.model, data_type)
+		self.model = load_compiled(self.model)
 		self.data_type = data_type
 		self.hosts = int(data_type.split('_')[-1])
-		_, _, (self.max_container_ips, self.max_energy, self.max_response) = eval("load_"+'_'.join(dtl[:-1])+"2_data("+dtl[-1]+")")
+		(self.max_container_ips, self.max_energy, self.max_response) = load_normalization(data_type)
 
 	def run_HSOGOBI2(self):
+		deadline = self.getDeadline()
 		cpu = [host.getCPU()/100 for host in self.env.hostlist]
 		cpu = np.array([cpu]).transpose()
 		if 'latency' in self.model.name:
 			cpuC = [(c.getApparentIPS()/self.max_container_ips if c else 0) for c in self.env.containerlist]
 			cpuC = np.array([cpuC]).transpose()
-			e, r = (0, 0) if self.env.stats == None else self.env.stats.runSimulationGOBI()
+			e, r = (0, 0) if self.env.stats == None else self.env.stats.runSimulationGOBI(deadline)
 			pred = np.broadcast_to(np.array([e/self.max_energy, r/self.max_response]), (self.hosts, 2))
 			cpu = np.concatenate((cpu, cpuC, pred), axis=1)
 		alloc = []; prev_alloc = {}
@@ -35,7 +37,8 @@ class HSOGOBI2Scheduler(Scheduler):
 			alloc.append(oneHot)
 		init = np.concatenate((cpu, alloc), axis=1)
 		init = torch.tensor(init, dtype=torch.float, requires_grad=True)
-		result, iteration, fitness = so_opt(init, self.model, [], self.data_type)
+		result, iteration, fitness = so_opt(init, self.model, [], self.data_type, deadline)
+		self.iterations, self.objective = iteration, float(fitness)
 		decision = []
 		for cid in prev_alloc:
 			one_hot = result[cid, -self.hosts:].tolist()
@@ -3,7 +3,7 @@ from .Scheduler import *
 class IQRMMTRScheduler(Scheduler):
     def __init__(self):
         super().__init__()
-        self.utilHistory = []
+        self.utilHistory = RingBuffer()
 
     def updateUtilHistory(self):
         hostUtils = []
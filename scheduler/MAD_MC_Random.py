@@ -6,8 +6,8 @@ from copy import deepcopy
 class MADMCRScheduler(Scheduler):
     def __init__(self):
         super().__init__()
-        self.utilHistory = []
-        self.utilHistoryContainer= []
+        self.utilHistory = RingBuffer()
+        self.utilHistoryContainer = RingBuffer()
 
     def updateUtilHistoryContainer(self):
         containerUtil = [(cid.getBaseIPS() if cid else 0) for cid in self.env.containerlist]
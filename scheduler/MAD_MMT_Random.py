@@ -6,7 +6,7 @@ from copy import deepcopy
 class MADMMTRScheduler(Scheduler):
     def __init__(self):
         super().__init__()
-        self.utilHistory = []
+        self.utilHistory = RingBuffer()
 
     def updateUtilHistory(self):
         hostUtils = []
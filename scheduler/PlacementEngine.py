@@ -0,0 +1,54 @@
+import numpy as np
+
+class PlacementEngine():
+    # Bin packing of containers onto hosts. Residual IPS, RAM size and disk
+    # size of every host are read once and updated as containers are
+    # assigned, so a host is never given more containers than fit on it.
+    # Feasibility checks all three resources, best and worst fit rank the
+    # feasible hosts on IPS only
+    def __init__(self, env):
+        self.env = env
+        self.residual = env.getHostsAvailable()
+
+    def feasible(self, req):
+        return np.all(req <= self.residual, axis=1)
+
+    def assign(self, containerID, hostID, req):
+        # The residual of the current host already excludes the container.
+        # A migrating container frees its resources there
+        currentHostID = self.env.getContainerByID(containerID).getHostID()
+        if currentHostID == hostID: return
+        if currentHostID != -1: self.residual[currentHostID] += req
+        self.residual[hostID] -= req
+
+    def place(self, containerIDs, choose, requirements=None):
+        # choose(req, feasible) gives the host of a container among feasible
+        # hosts, containers that fit nowhere are left out of the decision
+        if requirements is None: requirements = self.env.getContainerRequirements(containerIDs)
+        decision = []
+        for cid, req in zip(containerIDs, requirements):
+            feasible = self.feasible(req)
+            if not feasible.any(): continue
+            hostID = int(choose(req, feasible))
+            self.assign(cid, hostID, req)
+            decision.append((cid, hostID))
+        return decision
+
+    def firstFit(self, containerIDs, requirements=None):
+        return self.place(containerIDs, lambda req, feasible: np.argmax(feasible), requirements)
+
+    def bestFit(self, containerIDs):
+        # Feasible host with the least IPS left after placement
+        return self.place(containerIDs, lambda req, feasible: \
+            np.argmin(np.where(feasible, self.residual[:, 0] - req[0], np.inf)))
+
+    def worstFit(self, containerIDs):
+        # Feasible host with the most IPS left after placement
+        return self.place(containerIDs, lambda req, feasible: \
+            np.argmax(np.where(feasible, self.residual[:, 0] - req[0], -np.inf)))
+
+    def firstFitDecreasing(self, containerIDs):
+        # First fit of containers in decreasing order of IPS requirement
+        requirements = self.env.getContainerRequirements(containerIDs)
+        order = np.argsort(-requirements[:, 0], kind='stable')
+        return self.firstFit([containerIDs[i] for i in order], requirements[order])
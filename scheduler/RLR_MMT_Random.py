@@ -5,7 +5,7 @@ from copy import deepcopy
 class RLRMMTRScheduler(Scheduler):
 	def __init__(self):
 		super().__init__()
-		self.utilHistory = []
+		self.utilHistory = RingBuffer()
 
 	def updateUtilHistory(self):
 		hostUtils = []
@@ -1,17 +1,33 @@
 import math
 from utils.MathUtils import *
 from utils.MathConstants import *
+from utils.RingBuffer import RingBuffer
+from .PlacementEngine import PlacementEngine
 import pandas as pd
 from statistics import median
 import numpy as np
+from time import time
+import heapq
 
 class Scheduler():
     def __init__(self):
         self.env = None
+        self.timeBudget = None
+        # Iterations and objective of the last optimization (if any)
+        self.iterations = None
+        self.objective = None
 
     def setEnvironment(self, env):
         self.env = env
 
+    def setTimeBudget(self, seconds):
+        # Optimizing schedulers return their best decision so far once a
+        # scheduling call has run for this long
+        self.timeBudget = seconds
+
+    def getDeadline(self):
+        return time() + self.timeBudget if self.timeBudget else None
+
     def selection(self):
         pass
 
@@ -52,52 +68,35 @@ class Scheduler():
     def LRSelection(self, utilHistory):
         if (len(utilHistory) < LOCAL_REGRESSION_BANDWIDTH):
             return self.ThresholdHostSelection()
-        selectedHostIDs = []; x = list(range(LOCAL_REGRESSION_BANDWIDTH))
-        for i,host in enumerate(self.env.hostlist):
-            hostL = [utilHistory[j][i] for j in range(len(utilHistory))]
-            _, estimates = loess(x, hostL[-LOCAL_REGRESSION_BANDWIDTH:], poly_degree=1, alpha=0.6)
-            weights = estimates['b'].values[-1]
-            predictedCPU = weights[0] + weights[1] * (LOCAL_REGRESSION_BANDWIDTH + 1)
-            if LOCAL_REGRESSION_CPU_MULTIPLIER * predictedCPU >= 100:
-                selectedHostIDs.append(i)
-        return selectedHostIDs
+        x = list(range(LOCAL_REGRESSION_BANDWIDTH))
+        # Fit the utilization windows of all hosts at once, [H, window]
+        hostL = np.array(utilHistory[-LOCAL_REGRESSION_BANDWIDTH:], dtype=float).T
+        _, weights, _ = batch_loess(x, hostL, poly_degree=1, alpha=0.6)
+        weights = weights[:, -1]
+        predictedCPU = weights[:, 0] + weights[:, 1] * (LOCAL_REGRESSION_BANDWIDTH + 1)
+        return np.where(LOCAL_REGRESSION_CPU_MULTIPLIER * predictedCPU >= 100)[0].tolist()
 
     def RLRSelection(self, utilHistory):
         if (len(utilHistory) < LOCAL_REGRESSION_BANDWIDTH):
             return self.ThresholdHostSelection()
-        selectedHostIDs = []; x = list(range(LOCAL_REGRESSION_BANDWIDTH))
-        for i,host in enumerate(self.env.hostlist):
-            hostL = [utilHistory[j][i] for j in range(len(utilHistory))]
-            _, estimates = loess(x, hostL[-LOCAL_REGRESSION_BANDWIDTH:], poly_degree=1, alpha=0.6, robustify=True)
-            weights = estimates['b'].values[-1]
-            predictedCPU = weights[0] + weights[1] * (LOCAL_REGRESSION_BANDWIDTH + 1)
-            if LOCAL_REGRESSION_CPU_MULTIPLIER * predictedCPU >= 100:
-                selectedHostIDs.append(i)
-        return selectedHostIDs
+        x = list(range(LOCAL_REGRESSION_BANDWIDTH))
+        # Fit the utilization windows of all hosts at once, [H, window]
+        hostL = np.array(utilHistory[-LOCAL_REGRESSION_BANDWIDTH:], dtype=float).T
+        _, weights, _ = batch_loess(x, hostL, poly_degree=1, alpha=0.6, robustify=True)
+        weights = weights[:, -1]
+        predictedCPU = weights[:, 0] + weights[:, 1] * (LOCAL_REGRESSION_BANDWIDTH + 1)
+        return np.where(LOCAL_REGRESSION_CPU_MULTIPLIER * predictedCPU >= 100)[0].tolist()
 
     def MADSelection(self, utilHistory):
-        selectedHostIDs = []
-        for i, host in enumerate(self.env.hostlist):
-            hostL = [utilHistory[j][i] for j in range(len(utilHistory))]
-            median_hostL = np.median(np.array(hostL))
-            mad = np.median([abs(Utilhst-median_hostL) for Utilhst in hostL])
-            ThresholdCPU = 100-LOCAL_REGRESSION_CPU_MULTIPLIER * mad
-            UtilizedCPU = host.getCPU()
-            if UtilizedCPU > ThresholdCPU:
-                selectedHostIDs.append(i)
-        return selectedHostIDs
+        # utilHistory is a RingBuffer of host utilizations
+        ThresholdCPU = 100-LOCAL_REGRESSION_CPU_MULTIPLIER * utilHistory.mad()
+        UtilizedCPU = np.array([host.getCPU() for host in self.env.hostlist])
+        return np.where(UtilizedCPU > ThresholdCPU)[0].tolist()
 
     def IQRSelection(self, utilHistory):
-        selectedHostIDs = []
-        for i, host in enumerate(self.env.hostlist):
-            hostL = [utilHistory[j][i] for j in range(len(utilHistory))]
-            q1, q3 = np.percentile(np.array(hostL), [25, 75])
-            IQR = q3-q1
-            ThresholdCPU = 100-LOCAL_REGRESSION_CPU_MULTIPLIER * IQR
-            UtilizedCPU = host.getCPU()
-            if UtilizedCPU > ThresholdCPU:
-                selectedHostIDs.append(i)
-        return selectedHostIDs
+        ThresholdCPU = 100-LOCAL_REGRESSION_CPU_MULTIPLIER * utilHistory.iqr()
+        UtilizedCPU = np.array([host.getCPU() for host in self.env.hostlist])
+        return np.where(UtilizedCPU > ThresholdCPU)[0].tolist()
 
     # Container Selection
 
@@ -107,7 +106,7 @@ class Scheduler():
         selectedCount = np.random.randint(0, len(selectableIDs)) + 1
         selectedIDs = []; 
         while len(selectedIDs) < selectedCount:
-            idChoice = np.random.choice(selectableIDs)
+            idChoice = int(np.random.choice(selectableIDs))
             if self.env.containerlist[idChoice]:
                 selectedIDs.append(idChoice)
                 selectableIDs.remove(idChoice)
@@ -133,21 +132,19 @@ class Scheduler():
         return selectedContainerIDs
 
     def MaxCorContainerSelection(self, selectedHostIDs,utilHistoryContainer):
+        # Container with the highest multiple correlation with the others
+        # on its host over the utilization window. Scores within
+        # MAX_CORRELATION_TIE of the highest (e.g. containers with symmetric
+        # correlations, equal up to rounding) are ties, which go to the
+        # container with the lowest ID
         selectedContainerIDs = []
+        data = np.asarray(utilHistoryContainer)
         for hostID in selectedHostIDs:
             containerIDs = self.env.getContainersOfHost(hostID)
             if len(containerIDs):
-                hostL = [[utilHistoryContainer[j][cid] for j in range(len(utilHistoryContainer))] for cid in containerIDs]
-                data = pd.DataFrame(hostL)
-                data = data.T; RSquared = []
-                for i in range(data.shape[1]):
-                    x = np.array(data.drop(data.columns[i],axis=1))
-                    y = np.array(data.iloc[:,i])
-                    X1 = np.c_[x, np.ones(x.shape[0])]
-                    y_pred = np.dot(X1, np.dot(np.linalg.pinv(np.dot(np.transpose(X1), X1)), np.dot(np.transpose(X1), y)))
-                    corr = np.corrcoef(np.column_stack((y,y_pred)), rowvar=False)
-                    RSquared.append(corr[0][1] if not np.isnan(corr).any() else 0)
-                selectedContainerIDs.append(containerIDs[RSquared.index(max(RSquared))])
+                RSquared = multiple_correlation(data[:, containerIDs])
+                best = np.flatnonzero(RSquared >= RSquared.max() - MAX_CORRELATION_TIE)[0]
+                selectedContainerIDs.append(containerIDs[best])
         return selectedContainerIDs
 
     # Container placement
@@ -159,29 +156,33 @@ class Scheduler():
         return decision
 
     def FirstFitPlacement(self, containerIDs):
-        decision = []
-        for cid in containerIDs:
-            for hostID in range(len(self.env.hostlist)):
-                if self.env.getPlacementPossible(cid, hostID):
-                    decision.append((cid, hostID)); break
-        return decision
+        return PlacementEngine(self.env).firstFit(containerIDs)
+
+    def BestFitPlacement(self, containerIDs):
+        return PlacementEngine(self.env).bestFit(containerIDs)
+
+    def WorstFitPlacement(self, containerIDs):
+        return PlacementEngine(self.env).worstFit(containerIDs)
+
+    def FirstFitDecreasingPlacement(self, containerIDs):
+        return PlacementEngine(self.env).firstFitDecreasing(containerIDs)
 
     def LeastFullPlacement(self, containerIDs):
+        # One container per host from the least full one up, the rest go
+        # to the last (most full) host
         decision = []
         hostIPSs = [(self.env.hostlist[i].getCPU(), i) for i in range(len(self.env.hostlist))]
+        heapq.heapify(hostIPSs)
         for cid in containerIDs:
-            leastFullHost = min(hostIPSs)
+            leastFullHost = heapq.heappop(hostIPSs) if len(hostIPSs) > 1 else hostIPSs[0]
             decision.append((cid, leastFullHost[1]))
-            if len(hostIPSs) > 1:
-                hostIPSs.remove(leastFullHost)
         return decision
 
     def MaxFullPlacement(self, containerIDs):
         decision = []
-        hostIPSs = [(self.env.hostlist[i].getCPU(), i) for i in range(len(self.env.hostlist))]
+        hostIPSs = [(-self.env.hostlist[i].getCPU(), -i) for i in range(len(self.env.hostlist))]
+        heapq.heapify(hostIPSs)
         for cid in containerIDs:
-            maxFullHost = max(hostIPSs)
-            decision.append((cid, maxFullHost[1]))
-            if len(hostIPSs) > 1:
-                hostIPSs.remove(leastFullHost)
-        return decision
\ No newline at end of file
+            maxFullHost = heapq.heappop(hostIPSs) if len(hostIPSs) > 1 else hostIPSs[0]
+            decision.append((cid, -maxFullHost[1]))
+        return decision
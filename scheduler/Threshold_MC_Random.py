@@ -6,7 +6,7 @@ from copy import deepcopy
 class TMCRScheduler(Scheduler):
     def __init__(self):
         super().__init__()
-        self.utilHistoryContainer= []
+        self.utilHistoryContainer = RingBuffer()
 
     def updateUtilHistoryContainer(self):
         containerUtil = [(cid.getBaseIPS() if cid else 0) for cid in self.env.containerlist]
@@ -1,11 +1,147 @@
 from simulator.host.Host import *
 from simulator.container.Container import *
+from metrics.powermodels.PM import PowerTable
+from numbers import Integral
+import numpy as np
+
+class SimulatorState():
+	# Array backed store of container placement and resource usage.
+	# Per-host aggregates are updated from the containers of that host
+	# (the host to container index of the environment) when containers
+	# are allocated, destroyed or their usage changes, and are rebuilt in
+	# one pass at the start of every interval.
+	def __init__(self, hostlist, containerlimit, hostContainerIDs):
+		self.numhosts = len(hostlist)
+		self.hostContainerIDs = hostContainerIDs
+		self.ipsCap = np.array([host.ipsCap for host in hostlist], dtype=float)
+		self.hostOf = np.full(containerlimit, -1, dtype=int)
+		self.baseIPS = np.zeros(containerlimit)
+		self.maxIPS = np.zeros(containerlimit)
+		self.ram = np.zeros((containerlimit, 3))
+		self.disk = np.zeros((containerlimit, 3))
+		# RAM size of each container when it was last read (for migrations)
+		self.lastSize = np.zeros(containerlimit)
+		self.lastSizeInt = np.ones(containerlimit, dtype=bool)
+		# Whether values are ints, sums of ints are given back as ints
+		self.baseIPSInt = np.ones(containerlimit, dtype=bool)
+		self.ramInt = np.ones((containerlimit, 3), dtype=bool)
+		self.diskInt = np.ones((containerlimit, 3), dtype=bool)
+		self.hostBaseIPS = np.zeros(self.numhosts)
+		self.hostNumContainers = np.zeros(self.numhosts, dtype=int)
+		self.hostRAM = np.zeros((self.numhosts, 3))
+		self.hostDisk = np.zeros((self.numhosts, 3))
+		self.hostBaseIPSInt = np.ones(self.numhosts, dtype=bool)
+		self.hostRAMInt = np.ones((self.numhosts, 3), dtype=bool)
+		self.hostDiskInt = np.ones((self.numhosts, 3), dtype=bool)
+
+	def readContainer(self, container):
+		cid = container.id
+		ips, ram, disk = container.ipsmodel.getIPS(), container.rammodel.ram(), container.diskmodel.disk()
+		self.baseIPS[cid] = ips
+		self.maxIPS[cid] = container.ipsmodel.getMaxIPS()
+		self.ram[cid] = ram
+		self.disk[cid] = disk
+		self.baseIPSInt[cid] = isinstance(ips, Integral)
+		self.ramInt[cid] = [isinstance(v, Integral) for v in ram]
+		self.diskInt[cid] = [isinstance(v, Integral) for v in disk]
+
+	def sumHost(self, hid):
+		# Sum in container order like the list based host getters, so
+		# that rounding (e.g. of the int apparent IPS) matches them
+		if hid == -1: return
+		ids = self.getContainersOfHost(hid)
+		self.hostNumContainers[hid] = len(ids)
+		self.hostBaseIPSInt[hid] = self.baseIPSInt[ids].all()
+		self.hostRAMInt[hid] = self.ramInt[ids].all(axis=0)
+		self.hostDiskInt[hid] = self.diskInt[ids].all(axis=0)
+		if len(ids) == 0:
+			self.hostBaseIPS[hid] = 0; self.hostRAM[hid] = 0; self.hostDisk[hid] = 0
+			return
+		self.hostBaseIPS[hid] = np.cumsum(self.baseIPS[ids])[-1]
+		self.hostRAM[hid] = np.cumsum(self.ram[ids], axis=0)[-1]
+		self.hostDisk[hid] = np.cumsum(self.disk[ids], axis=0)[-1]
+
+	def getContainersOfHost(self, hid):
+		return np.array(sorted(self.hostContainerIDs[hid]), dtype=int)
+
+	def addContainer(self, container):
+		oldHostID = self.hostOf[container.id]
+		self.lastSize[container.id] = 0; self.lastSizeInt[container.id] = True
+		self.hostOf[container.id] = container.getHostID()
+		self.readContainer(container)
+		self.sumHost(oldHostID)
+		if self.hostOf[container.id] != oldHostID: self.sumHost(self.hostOf[container.id])
+
+	def updateContainer(self, container):
+		self.readContainer(container)
+		self.sumHost(self.hostOf[container.id])
+
+	def moveContainer(self, containerID, hostID):
+		oldHostID = self.hostOf[containerID]
+		self.hostOf[containerID] = hostID
+		self.sumHost(oldHostID)
+		if hostID != oldHostID: self.sumHost(hostID)
+
+	def refresh(self, containerlist):
+		self.hostOf[:] = -1
+		self.baseIPS[:] = 0; self.maxIPS[:] = 0
+		self.ram[:] = 0; self.disk[:] = 0
+		self.baseIPSInt[:] = True; self.ramInt[:] = True; self.diskInt[:] = True
+		for container in containerlist:
+			if container:
+				self.hostOf[container.id] = container.getHostID()
+				self.readContainer(container)
+		allocated = self.hostOf != -1
+		hosts = self.hostOf[allocated]
+		self.hostBaseIPS[:] = np.bincount(hosts, weights=self.baseIPS[allocated], minlength=self.numhosts)
+		self.hostNumContainers[:] = np.bincount(hosts, minlength=self.numhosts)
+		self.hostBaseIPSInt[:] = np.bincount(hosts, weights=~self.baseIPSInt[allocated], minlength=self.numhosts) == 0
+		for i in range(3):
+			self.hostRAM[:, i] = np.bincount(hosts, weights=self.ram[allocated, i], minlength=self.numhosts)
+			self.hostDisk[:, i] = np.bincount(hosts, weights=self.disk[allocated, i], minlength=self.numhosts)
+			self.hostRAMInt[:, i] = np.bincount(hosts, weights=~self.ramInt[allocated, i], minlength=self.numhosts) == 0
+			self.hostDiskInt[:, i] = np.bincount(hosts, weights=~self.diskInt[allocated, i], minlength=self.numhosts) == 0
+
+	def getHostBaseIPS(self, hostID):
+		baseIPS = self.hostBaseIPS[hostID].item()
+		return int(baseIPS) if self.hostBaseIPSInt[hostID] else baseIPS
+
+	def getHostRAM(self, hostID):
+		return tuple(int(v) if isInt else v for v, isInt in zip(self.hostRAM[hostID].tolist(), self.hostRAMInt[hostID]))
+
+	def getHostDisk(self, hostID):
+		return tuple(int(v) if isInt else v for v, isInt in zip(self.hostDisk[hostID].tolist(), self.hostDiskInt[hostID]))
+
+	def readHostRAM(self, hostID):
+		# Reading the RAM of a host reads that of its containers
+		ids = self.getContainersOfHost(hostID)
+		self.lastSize[ids] = self.ram[ids, 0]
+		self.lastSizeInt[ids] = self.ramInt[ids, 0]
+
+	def setContainerSize(self, containerID, size):
+		self.lastSize[containerID] = size
+		self.lastSizeInt[containerID] = isinstance(size, Integral)
+
+	def getContainerSize(self, containerID):
+		size = self.lastSize[containerID].item()
+		return int(size) if self.lastSizeInt[containerID] else size
+
+	def getApparentIPS(self, containerIDs):
+		hosts = self.hostOf[containerIDs]
+		canUseIPS = (self.ipsCap[hosts] - self.hostBaseIPS[hosts]) / self.hostNumContainers[hosts]
+		apparentIPS = np.minimum(self.maxIPS[containerIDs], self.baseIPS[containerIDs] + canUseIPS)
+		return np.where(canUseIPS < 0, 0, apparentIPS)
+
+	def getHostApparentIPS(self, hostID):
+		apparentIPS = self.getApparentIPS(self.getContainersOfHost(hostID))
+		return np.cumsum(apparentIPS)[-1] if len(apparentIPS) else 0
 
 class Simulator():
 	# Total power in watt
 	# Total Router Bw
 	# Interval Time in seconds
-	def __init__(self, TotalPower, RouterBw, Scheduler, ContainerLimit, IntervalTime, hostinit):
+	# Vectorized keeps host aggregates in a SimulatorState
+	def __init__(self, TotalPower, RouterBw, Scheduler, ContainerLimit, IntervalTime, hostinit, Vectorized=True):
 		self.totalpower = TotalPower
 		self.totalbw = RouterBw
 		self.hostlimit = len(hostinit)
@@ -16,9 +152,15 @@ class Simulator():
 		self.containerlist = []
 		self.intervaltime = IntervalTime
 		self.interval = 0
+		self.version = 0
 		self.inactiveContainers = []
 		self.stats = None
 		self.addHostlistInit(hostinit)
+		self.hostContainerIDs = [set() for _ in range(self.hostlimit)]
+		self.containersByCID = {}
+		self.powertable = PowerTable([host.powermodel for host in self.hostlist])
+		self.hostIPSCaps = np.array([host.ipsCap for host in self.hostlist], dtype=float)
+		self.state = SimulatorState(self.hostlist, self.containerlimit, self.hostContainerIDs) if Vectorized else None
 
 	def addHostInit(self, IPS, RAM, Disk, Bw, Latency, Powermodel):
 		assert len(self.hostlist) < self.hostlimit
@@ -33,6 +175,8 @@ class Simulator():
 	def addContainerInit(self, CreationID, CreationInterval, IPSModel, RAMModel, DiskModel):
 		container = Container(len(self.containerlist), CreationID, CreationInterval, IPSModel, RAMModel, DiskModel, self, HostID = -1)
 		self.containerlist.append(container)
+		self.containersByCID[CreationID] = container
+		if self.state: self.state.addContainer(container)
 		return container
 
 	def addContainerListInit(self, containerInfoList):
@@ -49,6 +193,8 @@ class Simulator():
 			if c == None or not c.active:
 				container = Container(i, CreationID, CreationInterval, IPSModel, RAMModel, DiskModel, self, HostID = -1)
 				self.containerlist[i] = container
+				self.containersByCID[CreationID] = container
+				if self.state: self.state.addContainer(container)
 				return container
 
 	def addContainerList(self, containerInfoList):
@@ -60,19 +206,23 @@ class Simulator():
 		return [container.id for container in deployedContainers]
 
 	def getContainersOfHost(self, hostID):
-		containers = []
-		for container in self.containerlist:
-			if container and container.hostid == hostID:
-				containers.append(container.id)
-		return containers
+		return sorted(self.hostContainerIDs[hostID])
+
+	def updateContainerHost(self, containerID, oldHostID, newHostID):
+		if oldHostID != -1: self.hostContainerIDs[oldHostID].discard(containerID)
+		if newHostID != -1: self.hostContainerIDs[newHostID].add(containerID)
+		if self.state: self.state.moveContainer(containerID, newHostID)
+		self.version += 1
+
+	def updateContainerUsage(self, container):
+		if self.state: self.state.updateContainer(container)
+		self.version += 1
 
 	def getContainerByID(self, containerID):
 		return self.containerlist[containerID]
 
 	def getContainerByCID(self, creationID):
-		for c in self.containerlist + self.inactiveContainers:
-			if c and c.creationID == creationID:
-				return c
+		return self.containersByCID.get(creationID)
 
 	def getHostByID(self, hostID):
 		return self.hostlist[hostID]
@@ -101,12 +251,31 @@ class Simulator():
 				# diskwritereq <= diskwriteav
 				)
 
+	def getHostsAvailable(self):
+		# IPS, RAM size and disk size available on each host, [hosts x 3]
+		return np.array([[host.getIPSAvailable(), host.getRAMAvailable()[0], host.getDiskAvailable()[0]] \
+			for host in self.hostlist], dtype=float).reshape(-1, 3)
+
+	def getContainerRequirements(self, containerIDs):
+		# IPS, RAM size and disk size required by each container, [containers x 3]
+		containers = [self.containerlist[cid] for cid in containerIDs]
+		return np.array([[container.getBaseIPS(), container.getRAM()[0], container.getDisk()[0]] \
+			for container in containers], dtype=float).reshape(-1, 3)
+
+	def getPlacementMatrix(self, containerIDs):
+		# getPlacementPossible of every container and host [containers x hosts]
+		# from one read of the current host and container usage
+		required, available = self.getContainerRequirements(containerIDs), self.getHostsAvailable()
+		return np.all(required[:, None, :] <= available[None, :, :], axis=2)
+
 	def addContainersInit(self, containerInfoListInit):
 		self.interval += 1
+		if self.state: self.state.refresh(self.containerlist)
 		deployed = self.addContainerListInit(containerInfoListInit)
 		return deployed
 
 	def allocateInit(self, decision):
+		if self.stats: self.stats.savePrediction(decision)
 		migrations = []
 		routerBwToEach = self.totalbw / len(decision)
 		for (cid, hid) in decision:
@@ -120,6 +289,7 @@ class Simulator():
 				container.allocateAndExecute(hid, allocbw)
 			# destroy pointer to this unallocated container as book-keeping is done by workload model
 			else: 
+				del self.containersByCID[container.creationID]
 				self.containerlist[cid] = None
 		return migrations
 
@@ -148,6 +318,7 @@ class Simulator():
 
 	def addContainers(self, newContainerList):
 		self.interval += 1
+		if self.state: self.state.refresh(self.containerlist)
 		destroyed = self.destroyCompletedContainers()
 		deployed = self.addContainerList(newContainerList)
 		return deployed, destroyed
@@ -158,7 +329,15 @@ class Simulator():
 	def getContainersInHosts(self):
 		return [len(self.getContainersOfHost(host)) for host in range(self.hostlimit)]
 
+	def getHostPowers(self):
+		return self.powertable.powerFromCPU([host.getCPU() for host in self.hostlist])
+
+	def getHostPowersFromIPS(self, ips):
+		# Power of each host if it were to run ips (one value per host)
+		return self.powertable.powerFromCPU(np.minimum(100, 100 * (np.asarray(ips) / self.hostIPSCaps)))
+
 	def simulationStep(self, decision):
+		if self.stats: self.stats.savePrediction(decision)
 		routerBwToEach = self.totalbw / len(decision) if len(decision) > 0 else self.totalbw
 		migrations = []
 		containerIDsAllocated = []
@@ -176,7 +355,9 @@ class Simulator():
 				containerIDsAllocated.append(cid)
 		# destroy pointer to unallocated containers as book-keeping is done by workload model
 		for (cid, hid) in decision:
-			if self.containerlist[cid].hostid == -1: self.containerlist[cid] = None
+			if self.containerlist[cid].hostid == -1:
+				del self.containersByCID[self.containerlist[cid].creationID]
+				self.containerlist[cid] = None
 		for i,container in enumerate(self.containerlist):
 			if container and i not in containerIDsAllocated:
 				container.execute(0)
@@ -1,3 +1,4 @@
+from utils.Utils import cachedPerInterval
 
 class Container():
 	# IPS = ips requirement
@@ -26,24 +27,32 @@ class Container():
 	def getBaseIPS(self):
 		return self.ipsmodel.getIPS()
 
+	@cachedPerInterval
 	def getApparentIPS(self):
 		if self.hostid == -1: return self.ipsmodel.getMaxIPS()
 		hostBaseIPS = self.getHost().getBaseIPS()
 		hostIPSCap = self.getHost().ipsCap
-		canUseIPS = (hostIPSCap - hostBaseIPS) / len(self.env.getContainersOfHost(self.hostid))
+		canUseIPS = (hostIPSCap - hostBaseIPS) / self.getHost().getNumContainers()
 		if canUseIPS < 0:
 			return 0
 		return min(self.ipsmodel.getMaxIPS(), self.getBaseIPS() + canUseIPS)
 
+	@cachedPerInterval
 	def getRAM(self):
 		rsize, rread, rwrite = self.rammodel.ram()
-		self.lastContainerSize = rsize
+		if self.env.state: self.env.state.setContainerSize(self.id, rsize)
+		else: self.lastContainerSize = rsize
 		return rsize, rread, rwrite
 
+	@cachedPerInterval
 	def getDisk(self):
 		return self.diskmodel.disk()
 
 	def getContainerSize(self):
+		# Kept in the simulator state if there is one
+		if self.env.state:
+			if self.env.state.getContainerSize(self.id) == 0: self.getRAM()
+			return self.env.state.getContainerSize(self.id)
 		if self.lastContainerSize == 0: self.getRAM()
 		return self.lastContainerSize
 
@@ -62,6 +71,7 @@ class Container():
 		if self.hostid != hostID:
 			lastMigrationTime += self.getContainerSize() / allocBw
 			lastMigrationTime += abs(self.env.hostlist[self.hostid].latency - self.env.hostlist[hostID].latency)
+		self.env.updateContainerHost(self.id, self.hostid, hostID)
 		self.hostid = hostID
 		return lastMigrationTime
 
@@ -76,12 +86,14 @@ class Container():
 		requiredExecTime = (self.ipsmodel.totalInstructions - self.ipsmodel.completedInstructions) / apparentIPS if apparentIPS else 0
 		self.totalExecTime += min(execTime, requiredExecTime)
 		self.ipsmodel.completedInstructions += apparentIPS * min(execTime, requiredExecTime)
+		self.env.updateContainerUsage(self)
 
 	def allocateAndExecute(self, hostID, allocBw):
 		self.execute(self.allocate(hostID, allocBw))
 
 	def destroy(self):
 		self.destroyAt = self.env.interval
+		self.env.updateContainerHost(self.id, self.hostid, -1)
 		self.hostid = -1
 		self.active = False
 
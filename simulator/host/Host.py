@@ -1,6 +1,7 @@
 from simulator.host.Disk import *
 from simulator.host.RAM import *
 from simulator.host.Bandwidth import *
+from utils.Utils import cachedPerInterval
 
 class Host():
 	# IPS = Million Instructions per second capacity 
@@ -19,18 +20,25 @@ class Host():
 		self.powermodel.host = self
 		self.env = Environment
 
+	@cachedPerInterval
 	def getPower(self):
 		return self.powermodel.power()
 
 	def getPowerFromIPS(self, ips):
 		return self.powermodel.powerFromCPU(min(100, 100 * (ips / self.ipsCap)))
 		
+	@cachedPerInterval
 	def getCPU(self):
 		ips = self.getApparentIPS()
 		return 100 * (ips / self.ipsCap)
 
+	def getNumContainers(self):
+		if self.env.state: return int(self.env.state.hostNumContainers[self.id])
+		return len(self.env.getContainersOfHost(self.id))
+
 	def getBaseIPS(self):
 		# Get base ips count as sum of min ips of all containers
+		if self.env.state: return self.env.state.getHostBaseIPS(self.id)
 		ips = 0
 		containers = self.env.getContainersOfHost(self.id)
 		for containerID in containers:
@@ -38,8 +46,10 @@ class Host():
 		# assert ips <= self.ipsCap
 		return ips
 
+	@cachedPerInterval
 	def getApparentIPS(self):
 		# Give containers remaining IPS for faster execution
+		if self.env.state: return int(self.env.state.getHostApparentIPS(self.id))
 		ips = 0
 		containers = self.env.getContainersOfHost(self.id)
 		for containerID in containers:
@@ -54,6 +64,11 @@ class Host():
 		return self.ipsCap - self.getBaseIPS()
 
 	def getCurrentRAM(self):
+		if self.env.state:
+			# Reading the RAM of the containers updates their last container
+			# size (used for migration times), as in the loop below
+			self.env.state.readHostRAM(self.id)
+			return self.env.state.getHostRAM(self.id)
 		size, read, write = 0, 0, 0
 		containers = self.env.getContainersOfHost(self.id)
 		for containerID in containers:
@@ -69,11 +84,14 @@ class Host():
 		return self.ramCap.size - size, self.ramCap.read - read, self.ramCap.write - write
 
 	def getCurrentDisk(self):
-		size, read, write = 0, 0, 0
-		containers = self.env.getContainersOfHost(self.id)
-		for containerID in containers:
-			s, r, w = self.env.getContainerByID(containerID).getDisk()
-			size += s; read += r; write += w
+		if self.env.state:
+			size, read, write = self.env.state.getHostDisk(self.id)
+		else:
+			size, read, write = 0, 0, 0
+			containers = self.env.getContainersOfHost(self.id)
+			for containerID in containers:
+				s, r, w = self.env.getContainerByID(containerID).getDisk()
+				size += s; read += r; write += w
 		assert size <= self.diskCap.size
 		assert read <= self.diskCap.read
 		assert write <= self.diskCap.write
@@ -1,4 +1,5 @@
 from .Workload import *
+from .TraceStore import loadTraceStore
 from simulator.container.IPSModels.IPSMBitbrain import *
 from simulator.container.RAMModels.RMBitbrain import *
 from simulator.container.DiskModels.DMBitbrain import *
@@ -16,19 +17,13 @@ warnings.simplefilter("ignore")
 # Source: https://archive.vn/20130205075133/http://www.tomshardware.com/charts/cpu-charts-2004/Sandra-CPU-Dhrystone,449.html
 ips_multiplier = 2054.0 / (2 * 600)
 
-def createfiles(df):
+def createfiles(df, store):
+	# Group the readings of the first 1000 VMs once and cycle through them
+	# to give every Bitbrains trace an Azure CPU utilization trace
 	vmids = df[1].unique()[:1000].tolist()
-	df = df[df[1].isin(vmids)]
-	vmid = 0
-	for i in tqdm(range(1, 501), ncols=80):
-		trace = []
-		bitbraindf = pd.read_csv(f'simulator/workload/datasets/bitbrain/rnd/{i}.csv')
-		reqlen = len(bitbraindf)
-		while len(trace) < reqlen:
-			vmid = (vmid + 1) % len(vmids)
-			trace += df[df[1] == vmids[vmid]][4].tolist()
-		trace = trace[:reqlen]
-		pd.DataFrame(trace).to_csv(f'simulator/workload/datasets/azure_2019/{i}.csv', header=False, index=False)
+	groups = df[df[1].isin(vmids)].groupby(1, sort=False)[4]
+	traces = [groups.get_group(vmid).to_numpy() for vmid in vmids]
+	store.cycleColumn('azure_2019', traces)
 
 class Azure2019Workload(Workload):
 	def __init__(self, meanNumContainers, sigmaNumContainers):
@@ -48,36 +43,37 @@ class Azure2019Workload(Workload):
 			for f in listdir(dataset_path+'rnd/2013-9/'): shutil.move(dataset_path+'rnd/2013-9/'+f, dataset_path+'rnd/')
 			shutil.rmtree(dataset_path+'rnd/2013-7'); shutil.rmtree(dataset_path+'rnd/2013-8')
 			shutil.rmtree(dataset_path+'rnd/2013-9'); remove(filename)
-		if not path.exists(az_dpath):
-			makedirs(az_dpath)
-			print('Downloading Azure 2019 Dataset')
-			url = 'https://azurecloudpublicdataset2.blob.core.windows.net/azurepublicdatasetv2/trace_data/vm_cpu_readings/vm_cpu_readings-file-1-of-195.csv.gz'
-			filename = wget.download(url);
-			df = pd.read_csv(filename, header=None, compression='gzip')
-			createfiles(df); remove(filename)
+		self.traces = loadTraceStore(dataset_path)
+		if not self.traces.hasColumn('azure_2019'):
+			# Traces written by older versions as one CSV per Bitbrains trace
+			if path.exists(az_dpath+'1.csv'): self.traces.importColumn('azure_2019', az_dpath)
+			else:
+				print('Downloading Azure 2019 Dataset')
+				url = 'https://azurecloudpublicdataset2.blob.core.windows.net/azurepublicdatasetv2/trace_data/vm_cpu_readings/vm_cpu_readings-file-1-of-195.csv.gz'
+				filename = wget.download(url);
+				df = pd.read_csv(filename, header=None, compression='gzip')
+				createfiles(df, self.traces); remove(filename)
+		self.traces.loadColumn('azure_2019')
 		self.dataset_path = dataset_path
 		self.az_dpath = az_dpath
 		self.disk_sizes = [1, 2, 3]
 		self.meanSLA, self.sigmaSLA = 20, 3
-		self.possible_indices = []
-		for i in range(1, 500):
-			df = pd.read_csv(self.dataset_path+'rnd/'+str(i)+'.csv', sep=';\t')
-			if (ips_multiplier*df['CPU usage [MHZ]']).to_list()[10] < 3000 and (ips_multiplier*df['CPU usage [MHZ]']).to_list()[10] > 500:
-				self.possible_indices.append(i)			
+		indices = np.arange(1, 500)
+		cpu = ips_multiplier*self.traces.getSample('cpu', 10, indices)
+		self.possible_indices = indices[(cpu < 3000) & (cpu > 500)].tolist()
 
 	def generateNewContainers(self, interval):
 		workloadlist = []
 		for i in range(max(1,int(gauss(self.mean, self.sigma)))):
 			CreationID = self.creation_id
 			index = self.possible_indices[randint(0,len(self.possible_indices)-1)]
-			df = pd.read_csv(self.dataset_path+'rnd/'+str(index)+'.csv', sep=';\t')
-			df2 = pd.read_csv(self.az_dpath+str(index)+'.csv', header=None)
+			trace = self.traces.getTrace(index)
 			sla = gauss(self.meanSLA, self.sigmaSLA)
-			ips = df['CPU capacity provisioned [MHZ]'].to_numpy() * df2.to_numpy()[:, 0] / 100
-			IPSModel = IPSMBitbrain((ips_multiplier*ips).tolist(), (ips_multiplier*df['CPU capacity provisioned [MHZ]']).to_list()[0], int(1.2*sla), interval + sla)
-			RAMModel = RMBitbrain((df['Memory usage [KB]']/4000).to_list(), (df['Network received throughput [KB/s]']/1000).to_list(), (df['Network transmitted throughput [KB/s]']/1000).to_list())
+			ips = trace['cpucap'] * trace['azure_2019'] / 100
+			IPSModel = IPSMBitbrain((ips_multiplier*ips).tolist(), float(ips_multiplier*trace['cpucap'][0]), int(1.2*sla), interval + sla)
+			RAMModel = RMBitbrain((trace['ram']/4000).tolist(), (trace['netrecv']/1000).tolist(), (trace['nettrans']/1000).tolist())
 			disk_size  = self.disk_sizes[index % len(self.disk_sizes)]
-			DiskModel = DMBitbrain(disk_size, (df['Disk read throughput [KB/s]']/4000).to_list(), (df['Disk write throughput [KB/s]']/12000).to_list())
+			DiskModel = DMBitbrain(disk_size, (trace['diskread']/4000).tolist(), (trace['diskwrite']/12000).tolist())
 			workloadlist.append((CreationID, interval, IPSModel, RAMModel, DiskModel))
 			self.creation_id += 1
 		self.createdContainers += workloadlist
@@ -1,4 +1,5 @@
 from .Workload import *
+from .TraceStore import loadTraceStore
 from simulator.container.IPSModels.IPSMBitbrain import *
 from simulator.container.RAMModels.RMBitbrain import *
 from simulator.container.DiskModels.DMBitbrain import *
@@ -7,7 +8,6 @@ from os import path, makedirs, listdir, remove
 import wget
 from zipfile import ZipFile
 import shutil
-import pandas as pd
 import warnings
 warnings.simplefilter("ignore")
 
@@ -32,18 +32,19 @@ class BWGD(Workload):
 		self.dataset_path = dataset_path
 		self.disk_sizes = [100, 200, 300, 400, 500]
 		self.meanSLA, self.sigmaSLA = 20, 3
+		self.traces = loadTraceStore(dataset_path)
 
 	def generateNewContainers(self, interval):
 		workloadlist = []
 		for i in range(max(1,int(gauss(self.mean, self.sigma)))):
 			CreationID = self.creation_id
 			index = randint(1,500)
-			df = pd.read_csv(self.dataset_path+'rnd/'+str(index)+'.csv', sep=';\t')
+			trace = self.traces.getTrace(index)
 			sla = gauss(self.meanSLA, self.sigmaSLA)
-			IPSModel = IPSMBitbrain((ips_multiplier*df['CPU usage [MHZ]']).to_list(), (ips_multiplier*df['CPU capacity provisioned [MHZ]']).to_list()[0], int(1.2*sla), interval + sla)
-			RAMModel = RMBitbrain((df['Memory usage [KB]']/1000).to_list(), (df['Network received throughput [KB/s]']/1000).to_list(), (df['Network transmitted throughput [KB/s]']/1000).to_list())
+			IPSModel = IPSMBitbrain((ips_multiplier*trace['cpu']).tolist(), float(ips_multiplier*trace['cpucap'][0]), int(1.2*sla), interval + sla)
+			RAMModel = RMBitbrain((trace['ram']/1000).tolist(), (trace['netrecv']/1000).tolist(), (trace['nettrans']/1000).tolist())
 			disk_size  = self.disk_sizes[index % len(self.disk_sizes)]
-			DiskModel = DMBitbrain(disk_size, (df['Disk read throughput [KB/s]']/1000).to_list(), (df['Disk write throughput [KB/s]']/1000).to_list())
+			DiskModel = DMBitbrain(disk_size, (trace['diskread']/1000).tolist(), (trace['diskwrite']/1000).tolist())
 			workloadlist.append((CreationID, interval, IPSModel, RAMModel, DiskModel))
 			self.creation_id += 1
 		self.createdContainers += workloadlist
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+from os import path, makedirs, listdir, replace, getpid
+
+# Short names of the Bitbrains trace columns kept in the store
+BITBRAIN_COLUMNS = {
+	'cpu': 'CPU usage [MHZ]',
+	'cpucap': 'CPU capacity provisioned [MHZ]',
+	'ram': 'Memory usage [KB]',
+	'netrecv': 'Network received throughput [KB/s]',
+	'nettrans': 'Network transmitted throughput [KB/s]',
+	'diskread': 'Disk read throughput [KB/s]',
+	'diskwrite': 'Disk write throughput [KB/s]',
+}
+
+stores = {}
+
+def loadTraceStore(dataset_path):
+	# One store per dataset path shared by all workload generators
+	if dataset_path not in stores:
+		stores[dataset_path] = TraceStore(dataset_path)
+	return stores[dataset_path]
+
+class TraceStore():
+	# Columnar copy of rnd/<i>.csv: each column of all traces is saved back
+	# to back in <column>.npy and trace i spans offsets[i-1]:offsets[i].
+	# Other traces (e.g. Azure CPU utilization) are added as columns aligned
+	# to the same offsets
+	def __init__(self, dataset_path):
+		self.path = dataset_path + 'store/'
+		if not path.exists(self.path + 'offsets.npy'):
+			self.build(dataset_path + 'rnd/')
+		self.offsets = np.load(self.path + 'offsets.npy')
+		self.columns = {}
+		for name in BITBRAIN_COLUMNS:
+			self.columns[name] = np.load(self.path + name + '.npy', mmap_mode='r')
+		self.numtraces = len(self.offsets) - 1
+
+	def save(self, name, array):
+		# Write to a temporary file first so that a concurrent or
+		# interrupted build never leaves a partial file behind
+		temp = self.path + name + '.' + str(getpid()) + '.tmp'
+		with open(temp, 'wb') as f: np.save(f, array)
+		replace(temp, self.path + name + '.npy')
+
+	def build(self, csv_path):
+		print('Building trace store for', csv_path)
+		makedirs(self.path, exist_ok=True)
+		numtraces = len([f for f in listdir(csv_path) if f.endswith('.csv')])
+		data = {name: [] for name in BITBRAIN_COLUMNS}
+		offsets = [0]
+		for i in range(1, numtraces+1):
+			df = pd.read_csv(csv_path+str(i)+'.csv', sep=';\t', engine='python')
+			for name, column in BITBRAIN_COLUMNS.items():
+				data[name].append(df[column].to_numpy(dtype=np.float64))
+			offsets.append(offsets[-1] + len(df))
+		for name in BITBRAIN_COLUMNS:
+			self.save(name, np.concatenate(data[name]))
+		# Offsets are written last as they mark the store as complete
+		self.save('offsets', np.array(offsets, dtype=np.int64))
+
+	def hasColumn(self, name):
+		return path.exists(self.path + name + '.npy')
+
+	def loadColumn(self, name):
+		if name not in self.columns:
+			self.columns[name] = np.load(self.path + name + '.npy', mmap_mode='r')
+		return self.columns[name]
+
+	def addColumn(self, name, array):
+		assert len(array) == self.offsets[-1]
+		self.save(name, np.asarray(array, dtype=np.float64))
+		return self.loadColumn(name)
+
+	def cycleColumn(self, name, traces):
+		# Fill each trace slot with the given traces in turn (starting from
+		# the second one), truncating the last one to the slot length
+		column, t = [], 0
+		for length in tqdm(np.diff(self.offsets), ncols=80):
+			slot, filled = [], 0
+			while filled < length:
+				t = (t + 1) % len(traces)
+				slot.append(traces[t]); filled += len(traces[t])
+			column.append(np.concatenate(slot)[:length])
+		return self.addColumn(name, np.concatenate(column))
+
+	def importColumn(self, name, csv_path):
+		# Convert per trace <i>.csv files written by older versions
+		column = []
+		for i in range(1, self.numtraces+1):
+			column.append(pd.read_csv(csv_path+str(i)+'.csv', header=None)[0].to_numpy(dtype=np.float64))
+		return self.addColumn(name, np.concatenate(column))
+
+	def getTrace(self, index):
+		start, end = self.offsets[index-1], self.offsets[index]
+		return {name: column[start:end] for name, column in self.columns.items()}
+
+	def getSample(self, name, row, indices):
+		# Value at a given row of each trace in indices (1-based)
+		indices = np.asarray(indices)
+		return self.columns[name][self.offsets[indices-1] + row]
@@ -0,0 +1,159 @@
+import pandas as pd
+import pickle
+import shutil
+import tempfile
+import atexit
+from os import path, makedirs
+
+# Number of intervals kept in memory per table before spooling to disk
+CHUNK_SIZE = 50
+
+class Recorder():
+	# Spool directory of the interval tables of a Stats object. Tables are
+	# written to a temporary directory while running and copied next to
+	# the logs with save(). The temporary directory is removed at exit
+	def __init__(self, chunksize=CHUNK_SIZE):
+		self.path = tempfile.mkdtemp(prefix='cosco_stats_') + '/'
+		atexit.register(shutil.rmtree, self.path, True)
+		self.savedpath = None
+		self.chunksize = chunksize
+		self.tables = {}
+
+	def table(self, name):
+		if name not in self.tables:
+			self.tables[name] = Table(name, self)
+		return self.tables[name]
+
+	def save(self, dirname, move=False):
+		# Copy spooled chunks to dirname/records, after a move the recorder
+		# keeps reading and writing there. Chunks are never rewritten, so
+		# only those missing in dirname/records (new since the last save, or
+		# all of them if the directory was recreated) are copied
+		savedpath = dirname + '/records/'
+		if path.abspath(savedpath) != path.abspath(self.path):
+			makedirs(savedpath, exist_ok=True)
+			for table in self.tables.values():
+				for k in range(table.numchunks):
+					target = savedpath + path.basename(table.chunkFile(k))
+					if not path.exists(target): shutil.copy(table.chunkFile(k), target)
+			if move:
+				shutil.rmtree(self.path, ignore_errors=True)
+				self.path = savedpath
+		self.savedpath = savedpath
+
+	def __getstate__(self):
+		# A pickled recorder refers to its last saved copy
+		state = self.__dict__.copy()
+		if self.savedpath: state['path'] = self.savedpath
+		return state
+
+class Table():
+	# Append only list of interval records (dicts). Every chunksize rows are
+	# written to disk as one chunk of columns and only the last chunks stay
+	# in memory. Supports len, indexing, slicing and iteration like a list
+	def __init__(self, name, recorder):
+		self.name = name
+		self.recorder = recorder
+		self.numchunks = 0
+		self.rows = []
+		self.lastchunk = []
+
+	def chunkFile(self, k):
+		return self.recorder.path + self.name + '_' + str(k) + '.pk'
+
+	def append(self, row):
+		self.rows.append(row)
+		if len(self.rows) == self.recorder.chunksize:
+			with open(self.chunkFile(self.numchunks), 'wb') as f:
+				pickle.dump({key: [r[key] for r in self.rows] for key in row}, f)
+			self.numchunks += 1
+			self.lastchunk, self.rows = self.rows, []
+
+	def readColumns(self, k):
+		with open(self.chunkFile(k), 'rb') as f:
+			return pickle.load(f)
+
+	def readChunk(self, k):
+		if k == self.numchunks: return self.rows
+		if k == self.numchunks - 1 and self.lastchunk: return self.lastchunk
+		columns = self.readColumns(k)
+		return [dict(zip(columns.keys(), values)) for values in zip(*columns.values())]
+
+	def column(self, key):
+		values = []
+		for k in range(self.numchunks):
+			if k == self.numchunks - 1 and self.lastchunk: values += [r[key] for r in self.lastchunk]
+			else: values += self.readColumns(k)[key]
+		return values + [r[key] for r in self.rows]
+
+	def __len__(self):
+		return self.numchunks * self.recorder.chunksize + len(self.rows)
+
+	def __iter__(self):
+		for k in range(self.numchunks + 1):
+			yield from self.readChunk(k)
+
+	def __getitem__(self, index):
+		if isinstance(index, slice):
+			return [self[i] for i in range(*index.indices(len(self)))]
+		if index < 0: index += len(self)
+		if not 0 <= index < len(self): raise IndexError('table index out of range')
+		return self.readChunk(index // self.recorder.chunksize)[index % self.recorder.chunksize]
+
+	def __getstate__(self):
+		# The last chunk is on disk already
+		state = self.__dict__.copy()
+		state['lastchunk'] = []
+		return state
+
+class DeltaView():
+	# Full rows of a table whose rows only list the entries (identified by
+	# key) that changed in that interval. Entries keep their last recorded
+	# values and every row lists all entries seen so far, sorted by key
+	def __init__(self, table, key):
+		self.table = table
+		self.key = key
+
+	def __len__(self):
+		return len(self.table)
+
+	def __iter__(self):
+		entries = {}
+		for delta in self.table:
+			fields = [f for f in delta if f != self.key and isinstance(delta[f], list)]
+			for i, k in enumerate(delta[self.key]):
+				entries[k] = [delta[f][i] for f in fields]
+			values = [entries[k] for k in sorted(entries)]
+			row = {}
+			for f in delta:
+				if f in fields: row[f] = [v[fields.index(f)] for v in values]
+				elif f != self.key: row[f] = delta[f]
+			yield row
+
+	def __getitem__(self, index):
+		index = range(len(self))[index]
+		for i, row in enumerate(self):
+			if i == index: return row
+
+def writeCSV(filename, rows, header=False, batchsize=CHUNK_SIZE):
+	# rows() gives a fresh iterator over rows (lists of values), which are
+	# written in batches. As in a single DataFrame of all rows, a column is
+	# written as float if any batch of it holds floats
+	floats = set()
+	for df in batches(rows(), header, batchsize):
+		floats.update(c for c, dtype in zip(df.columns, df.dtypes) if dtype.kind == 'f')
+	first = True
+	for df in batches(rows(), header, batchsize):
+		for c in floats:
+			if df[c].dtype.kind in 'iu': df[c] = df[c].astype(float)
+		df.to_csv(filename, header=bool(header) and first, index=False, mode='w' if first else 'a')
+		first = False
+
+def batches(rows, header, batchsize):
+	batch = []
+	for row in rows:
+		batch.append(row)
+		if len(batch) == batchsize:
+			yield pd.DataFrame(batch, columns=header if header else None)
+			batch = []
+	if batch: yield pd.DataFrame(batch, columns=header if header else None)
@@ -1,36 +1,60 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
-from scheduler.GOBI import GOBIScheduler
+import copy
+from time import time
+from itertools import islice
+from stats.Recorder import Recorder, DeltaView, writeCSV
 
 plt.style.use(['science'])
 plt.rcParams["text.usetex"] = False
 
 class Stats():
-	def __init__(self, Environment, WorkloadModel, Datacenter, Scheduler):
+	# Cosimulation predicts metrics by running GOBI every interval, otherwise
+	# the decision of the active scheduler is simulated on the allocation
+	# before the environment applies it
+	def __init__(self, Environment, WorkloadModel, Datacenter, Scheduler, Cosimulation=False):
 		self.env = Environment
 		self.env.stats = self
 		self.workload = WorkloadModel
 		self.datacenter = Datacenter
 		self.scheduler = Scheduler
-		self.simulated_scheduler = GOBIScheduler('energy_latency_'+str(self.datacenter.num_hosts))
-		self.simulated_scheduler.env = self.env
+		self.cosimulation = Cosimulation
+		self.simulated_scheduler = None
+		self.prediction = None
 		self.initStats()
 
+	def getSimulatedScheduler(self):
+		# GOBI is loaded on first use. An active GOBI scheduler with the same
+		# model is copied, sharing the model but not its optimizer state
+		if not self.simulated_scheduler:
+			data_type = 'energy_latency_'+str(self.datacenter.num_hosts)
+			if self.scheduler.__class__.__name__ == 'GOBIScheduler' and self.scheduler.data_type == data_type:
+				self.simulated_scheduler = copy.copy(self.scheduler)
+				self.simulated_scheduler.warmstart, self.simulated_scheduler.param = False, None
+				self.simulated_scheduler.timeBudget = None
+			else:
+				from scheduler.GOBI import GOBIScheduler
+				self.simulated_scheduler = GOBIScheduler(data_type)
+			self.simulated_scheduler.env = self.env
+		return self.simulated_scheduler
+
 	def initStats(self):	
-		self.hostinfo = []
-		self.workloadinfo = []
-		self.activecontainerinfo = []
-		self.allcontainerinfo = []
-		self.metrics = []
-		self.schedulerinfo = []
+		self.recorder = Recorder()
+		self.hostinfo = self.recorder.table('hostinfo')
+		self.workloadinfo = self.recorder.table('workloadinfo')
+		self.activecontainerinfo = self.recorder.table('activecontainerinfo')
+		self.allcontainerinfo = self.recorder.table('allcontainerinfo')
+		self.currentCreationIDs = set()
+		self.metrics = self.recorder.table('metrics')
+		self.schedulerinfo = self.recorder.table('schedulerinfo')
 
 	def saveHostInfo(self):
 		hostinfo = dict()
 		hostinfo['interval'] = self.env.interval
 		hostinfo['cpu'] = [host.getCPU() for host in self.env.hostlist]
 		hostinfo['numcontainers'] = [len(self.env.getContainersOfHost(i)) for i,host in enumerate(self.env.hostlist)]
-		hostinfo['power'] = [host.getPower() for host in self.env.hostlist]
+		hostinfo['power'] = self.env.getHostPowers().tolist()
 		hostinfo['baseips'] = [host.getBaseIPS() for host in self.env.hostlist]
 		hostinfo['ipsavailable'] = [host.getIPSAvailable() for host in self.env.hostlist]
 		hostinfo['ipscap'] = [host.ipsCap for host in self.env.hostlist]
@@ -45,7 +69,7 @@ class Stats():
 		workloadinfo = dict()
 		workloadinfo['interval'] = self.env.interval
 		workloadinfo['totalcontainers'] = len(self.workload.createdContainers)
-		if self.workloadinfo != []:
+		if self.workloadinfo:
 			workloadinfo['newcontainers'] = workloadinfo['totalcontainers'] - self.workloadinfo[-1]['totalcontainers'] 
 		else:
 			workloadinfo['newcontainers'] = workloadinfo['totalcontainers']
@@ -68,11 +92,19 @@ class Stats():
 		self.activecontainerinfo.append(containerinfo)
 
 	def saveAllContainerInfo(self):
+		# Only deployed containers in the container list and those removed
+		# from it since the last interval are recorded, as the values of
+		# removed containers do not change. getAllContainerInfo gives the
+		# full table
 		containerinfo = dict()
-		allCreatedContainers = [self.env.getContainerByCID(cid) for cid in list(np.where(self.workload.deployedContainers)[0])]
+		current = set(c.creationID for c in self.env.containerlist if c and self.workload.deployedContainers[c.creationID])
+		creationIDs = sorted(current | self.currentCreationIDs)
+		self.currentCreationIDs = current
+		allCreatedContainers = [self.env.getContainerByCID(cid) for cid in creationIDs]
 		containerinfo['interval'] = self.env.interval
+		containerinfo['creationids'] = creationIDs
 		if self.datacenter.__class__.__name__ == 'Datacenter':
-			containerinfo['application'] = [self.env.getContainerByCID(cid).application for cid in list(np.where(self.workload.deployedContainers)[0])]
+			containerinfo['application'] = [c.application for c in allCreatedContainers]
 		containerinfo['ips'] = [(c.getBaseIPS() if c.active else 0) for c in allCreatedContainers]
 		containerinfo['create'] = [(c.createAt) for c in allCreatedContainers]
 		containerinfo['start'] = [(c.startAt) for c in allCreatedContainers]
@@ -84,12 +116,18 @@ class Stats():
 		containerinfo['active'] = [(c.active) for c in allCreatedContainers]
 		self.allcontainerinfo.append(containerinfo)
 
-	def saveMetrics(self, destroyed, migrations):
+	def getAllContainerInfo(self):
+		# Rows of all deployed containers ordered by creation ID
+		if self.allcontainerinfo and 'creationids' not in self.allcontainerinfo[0]:
+			return self.allcontainerinfo
+		return DeltaView(self.allcontainerinfo, 'creationids')
+
+	def saveMetrics(self, destroyed, migrations, decision):
 		metrics = dict()
 		metrics['interval'] = self.env.interval
 		metrics['numdestroyed'] = len(destroyed)
 		metrics['nummigrations'] = len(migrations)
-		metrics['energy'] = [host.getPower()*self.env.intervaltime for host in self.env.hostlist]
+		metrics['energy'] = (self.env.getHostPowers()*self.env.intervaltime).tolist()
 		metrics['energytotalinterval'] = np.sum(metrics['energy'])
 		metrics['energypercontainerinterval'] = np.sum(metrics['energy'])/self.env.getNumActiveContainers()
 		metrics['responsetime'] = [c.totalExecTime + c.totalMigrationTime for c in destroyed]
@@ -99,9 +137,23 @@ class Stats():
 		metrics['slaviolations'] = len(np.where([c.destroyAt > c.sla for c in destroyed])[0])
 		metrics['slaviolationspercentage'] = metrics['slaviolations'] * 100.0 / len(destroyed) if len(destroyed) > 0 else 0
 		metrics['waittime'] = [c.startAt - c.createAt for c in destroyed]
-		metrics['energytotalinterval_pred'], metrics['avgresponsetime_pred'] = self.runSimulationGOBI()
+		if self.cosimulation:
+			start = time()
+			metrics['energytotalinterval_pred'], metrics['avgresponsetime_pred'] = self.runSimulationGOBI()
+			metrics['simulationtime'] = time() - start
+		else:
+			# None if the environment did not give the decision before the step
+			metrics['energytotalinterval_pred'], metrics['avgresponsetime_pred'], metrics['simulationtime'] = \
+				self.prediction if self.prediction else (None, None, None)
+			self.prediction = None
 		self.metrics.append(metrics)
 
+	def savePrediction(self, decision):
+		# Called by the environment before it applies decision
+		if self.cosimulation: return
+		start = time()
+		self.prediction = self.runSimpleSimulation(decision) + (time() - start,)
+
 	def saveSchedulerInfo(self, selectedcontainers, decision, schedulingtime):
 		schedulerinfo = dict()
 		schedulerinfo['interval'] = self.env.interval
@@ -109,6 +161,9 @@ class Stats():
 		schedulerinfo['decision'] = decision
 		schedulerinfo['schedule'] = [(c.id, c.getHostID()) if c else (None, None) for c in self.env.containerlist]
 		schedulerinfo['schedulingtime'] = schedulingtime
+		if self.scheduler.iterations is not None:
+			schedulerinfo['iterations'] = self.scheduler.iterations
+			schedulerinfo['objective'] = self.scheduler.objective
 		if self.datacenter.__class__.__name__ == 'Datacenter':
 			schedulerinfo['migrationTime'] = self.env.intervalAllocTimings[-1]
 		self.schedulerinfo.append(schedulerinfo)
@@ -118,48 +173,50 @@ class Stats():
 		self.saveWorkloadInfo(deployed, migrations)
 		self.saveContainerInfo()
 		self.saveAllContainerInfo()
-		self.saveMetrics(destroyed, migrations)
+		self.saveMetrics(destroyed, migrations, decision)
 		self.saveSchedulerInfo(selectedcontainers, decision, schedulingtime)
 
 	def runSimpleSimulation(self, decision):
-		host_alloc = []; container_alloc = [-1] * len(self.env.hostlist)
+		host_alloc = []; container_alloc = [-1] * len(self.env.containerlist)
 		for i in range(len(self.env.hostlist)):
 			host_alloc.append([])
 		for c in self.env.containerlist:
 			if c and c.getHostID() != -1: 
 				host_alloc[c.getHostID()].append(c.id) 
 				container_alloc[c.id] = c.getHostID()
-		decision = self.simulated_scheduler.filter_placement(decision)
-		for cid, hid in decision:
-			if self.env.getPlacementPossible(cid, hid) and container_alloc[cid] != -1:
-				host_alloc[container_alloc[cid]].remove(cid)
+		# Containers not yet placed are deployed by the decision
+		moves = [(cid, hid) for cid, hid in decision if container_alloc[cid] != hid]
+		possible = self.env.getPlacementMatrix([cid for cid, _ in moves])
+		for i, (cid, hid) in enumerate(moves):
+			if possible[i, hid]:
+				if container_alloc[cid] != -1: host_alloc[container_alloc[cid]].remove(cid)
 				host_alloc[hid].append(cid)
-		energytotalinterval_pred = 0
-		for hid, cids in enumerate(host_alloc):
-			ips = 0
-			for cid in cids: ips += self.env.containerlist[cid].getApparentIPS()
-			energytotalinterval_pred += self.env.hostlist[hid].getPowerFromIPS(ips)
+		ips = [sum(self.env.containerlist[cid].getApparentIPS() for cid in cids) for cids in host_alloc]
+		energytotalinterval_pred = sum(self.env.getHostPowersFromIPS(ips).tolist())
 		return energytotalinterval_pred*self.env.intervaltime, max(0, np.mean([metric_d['avgresponsetime'] for metric_d in self.metrics[-5:]]))
 
-	def runSimulationGOBI(self):
-		host_alloc = []; container_alloc = [-1] * len(self.env.hostlist)
+	def runSimulationGOBI(self, deadline=None):
+		# A scheduler running the co-simulation within its time budget
+		# passes its deadline, GOBI then returns its best decision by then
+		host_alloc = []; container_alloc = [-1] * len(self.env.containerlist)
 		for i in range(len(self.env.hostlist)):
 			host_alloc.append([])
 		for c in self.env.containerlist:
 			if c and c.getHostID() != -1: 
 				host_alloc[c.getHostID()].append(c.id) 
 				container_alloc[c.id] = c.getHostID()
-		selected = self.simulated_scheduler.selection()
-		decision = self.simulated_scheduler.filter_placement(self.simulated_scheduler.placement(selected))
-		for cid, hid in decision:
-			if self.env.getPlacementPossible(cid, hid) and container_alloc[cid] != -1:
+		scheduler = self.getSimulatedScheduler()
+		scheduler.setTimeBudget(max(deadline - time(), 1e-6) if deadline else None)
+		selected = scheduler.selection()
+		decision = scheduler.filter_placement(scheduler.placement(selected))
+		moves = [(cid, hid) for cid, hid in decision if container_alloc[cid] != -1]
+		possible = self.env.getPlacementMatrix([cid for cid, _ in moves])
+		for i, (cid, hid) in enumerate(moves):
+			if possible[i, hid]:
 				host_alloc[container_alloc[cid]].remove(cid)
 				host_alloc[hid].append(cid)
-		energytotalinterval_pred = 0
-		for hid, cids in enumerate(host_alloc):
-			ips = 0
-			for cid in cids: ips += self.env.containerlist[cid].getApparentIPS()
-			energytotalinterval_pred += self.env.hostlist[hid].getPowerFromIPS(ips)
+		ips = [sum(self.env.containerlist[cid].getApparentIPS() for cid in cids) for cids in host_alloc]
+		energytotalinterval_pred = sum(self.env.getHostPowersFromIPS(ips).tolist())
 		return energytotalinterval_pred*self.env.intervaltime, max(0, np.mean([metric_d['avgresponsetime'] for metric_d in self.metrics[-5:]]))
 
 	########################################################################################################
@@ -169,14 +226,10 @@ class Stats():
 		title = obj + '_' + metric + '_with_interval' 
 		totalIntervals = len(listinfo)
 		x = list(range(totalIntervals))
-		metric_with_interval = []; metric2_with_interval = []
-		ylimit = 0; ylimit2 = 0
-		for hostID in range(len(listinfo[0][metric])):
-			metric_with_interval.append([listinfo[interval][metric][hostID] for interval in range(totalIntervals)])
-			ylimit = max(ylimit, max(metric_with_interval[-1]))
-			if metric2:
-				metric2_with_interval.append([listinfo[interval][metric2][hostID] for interval in range(totalIntervals)])
-				ylimit2 = max(ylimit2, max(metric2_with_interval[-1]))
+		metric_with_interval = [list(values) for values in zip(*listinfo.column(metric))]
+		metric2_with_interval = [list(values) for values in zip(*listinfo.column(metric2))] if metric2 else []
+		ylimit = max(0, max(map(max, metric_with_interval)))
+		ylimit2 = max(0, max(map(max, metric2_with_interval))) if metric2 else 0
 		for hostID in range(len(listinfo[0][metric])):
 			axes[hostID].set_ylim(0, max(ylimit, ylimit2))
 			axes[hostID].plot(x, metric_with_interval[hostID])
@@ -193,8 +246,8 @@ class Stats():
 		res = {}
 		for i,metric in enumerate(['numdestroyed', 'nummigrations', 'energytotalinterval', 'avgresponsetime',\
 			 'avgmigrationtime', 'slaviolations', 'slaviolationspercentage', 'waittime', 'energypercontainerinterval']):
-			metric_with_interval = [self.metrics[i][metric] for i in range(len(self.metrics))] if metric != 'waittime' else \
-				[sum(self.metrics[i][metric]) for i in range(len(self.metrics))]
+			metric_with_interval = self.metrics.column(metric) if metric != 'waittime' else \
+				[sum(waittime) for waittime in self.metrics.column(metric)]
 			axes[i].plot(x, metric_with_interval)
 			axes[i].set_ylabel(metric, fontsize=5)
 			axes[i].grid(b=True, which='both', color='#eeeeee', linestyle='-')
@@ -208,7 +261,7 @@ class Stats():
 		fig, axes = plt.subplots(5, 1, sharex=True, figsize=(4, 5))
 		x = list(range(len(self.workloadinfo)))
 		for i,metric in enumerate(['totalcontainers', 'newcontainers', 'deployed', 'migrations', 'inqueue']):
-			metric_with_interval = [self.workloadinfo[i][metric] for i in range(len(self.workloadinfo))]
+			metric_with_interval = self.workloadinfo.column(metric)
 			axes[i].plot(x, metric_with_interval)
 			axes[i].set_ylabel(metric)
 			axes[i].grid(b=True, which='both', color='#eeeeee', linestyle='-')
@@ -219,57 +272,31 @@ class Stats():
 
 	def generateCompleteDataset(self, dirname, data, name):
 		title = name + '_with_interval' 
-		metric_with_interval = []
 		headers = list(data[0].keys())
-		for datum in data:
-			metric_with_interval.append([datum[value] for value in datum.keys()])
-		df = pd.DataFrame(metric_with_interval, columns=headers)
-		df.to_csv(dirname + '/' + title + '.csv', index=False)
+		rows = lambda: ([datum[value] for value in datum.keys()] for datum in data)
+		writeCSV(dirname + '/' + title + '.csv', rows, header=headers)
 
 	def generateDatasetWithInterval(self, dirname, metric, objfunc, metric2=None, objfunc2=None):
 		title = metric + '_' + (metric2 + '_' if metric2 else "") + (objfunc + '_' if objfunc else "") + (objfunc2 + '_' if objfunc2 else "") + 'with_interval' 
-		totalIntervals = len(self.hostinfo)
-		metric_with_interval = []; metric2_with_interval = [] # metric1 is of host and metric2 is of containers
-		host_alloc_with_interval = []; objfunc2_with_interval = []
-		objfunc_with_interval = []
-		for interval in range(totalIntervals-1):
-			metric_with_interval.append([self.hostinfo[interval][metric][hostID] for hostID in range(len(self.hostinfo[0][metric]))])
-			host_alloc_with_interval.append([self.activecontainerinfo[interval]['hostalloc'][cID] for cID in range(len(self.activecontainerinfo[0]['hostalloc']))])
-			objfunc_with_interval.append(self.metrics[interval+1][objfunc])
-			if metric2:
-				metric2_with_interval.append(self.activecontainerinfo[interval][metric2])
-			if objfunc2:
-				objfunc2_with_interval.append(self.metrics[interval+1][objfunc2])
-		df = pd.DataFrame(metric_with_interval)
-		if metric2: df = pd.concat([df, pd.DataFrame(metric2_with_interval)], axis=1)
-		df = pd.concat([df, pd.DataFrame(host_alloc_with_interval)], axis=1)
-		df = pd.concat([df, pd.DataFrame(objfunc_with_interval)], axis=1)
-		if objfunc2: df = pd.concat([df, pd.DataFrame(objfunc2_with_interval)], axis=1)
-		df.to_csv(dirname + '/' + title + '.csv' , header=False, index=False)
+		# metric1 is of host and metric2 is of containers, objective functions are of the next interval
+		def rows():
+			for hostinfo, containerinfo, metrics in zip(self.hostinfo, self.activecontainerinfo, islice(self.metrics, 1, None)):
+				row = list(hostinfo[metric])
+				if metric2: row += containerinfo[metric2]
+				row += containerinfo['hostalloc']
+				row.append(metrics[objfunc])
+				if objfunc2: row.append(metrics[objfunc2])
+				yield row
+		writeCSV(dirname + '/' + title + '.csv', rows)
 
 	def generateDatasetWithInterval2(self, dirname, metric, metric2, metric3, metric4, objfunc, objfunc2):
 		title = metric + '_' + metric2 + '_'  + metric3 + '_'  + metric4 + '_'  +objfunc + '_' + objfunc2 + '_' + 'with_interval' 
-		totalIntervals = len(self.hostinfo)
-		metric_with_interval = []; metric2_with_interval = [] 
-		metric3_with_interval = []; metric4_with_interval = []
-		host_alloc_with_interval = []; objfunc2_with_interval = []
-		objfunc_with_interval = []
-		for interval in range(totalIntervals-1):
-			metric_with_interval.append([self.hostinfo[interval][metric][hostID] for hostID in range(len(self.hostinfo[0][metric]))])
-			host_alloc_with_interval.append([self.activecontainerinfo[interval]['hostalloc'][cID] for cID in range(len(self.activecontainerinfo[0]['hostalloc']))])
-			objfunc_with_interval.append(self.metrics[interval+1][objfunc])
-			metric2_with_interval.append(self.activecontainerinfo[interval][metric2])
-			metric3_with_interval.append(self.metrics[interval][metric3])
-			metric4_with_interval.append(self.metrics[interval][metric4])
-			objfunc2_with_interval.append(self.metrics[interval+1][objfunc2])
-		df = pd.DataFrame(metric_with_interval)
-		df = pd.concat([df, pd.DataFrame(metric2_with_interval)], axis=1)
-		df = pd.concat([df, pd.DataFrame(host_alloc_with_interval)], axis=1)
-		df = pd.concat([df, pd.DataFrame(metric3_with_interval)], axis=1)
-		df = pd.concat([df, pd.DataFrame(metric4_with_interval)], axis=1)
-		df = pd.concat([df, pd.DataFrame(objfunc_with_interval)], axis=1)
-		df = pd.concat([df, pd.DataFrame(objfunc2_with_interval)], axis=1)
-		df.to_csv(dirname + '/' + title + '.csv' , header=False, index=False)
+		def rows():
+			for hostinfo, containerinfo, metrics, nextmetrics in zip(self.hostinfo, self.activecontainerinfo, self.metrics, islice(self.metrics, 1, None)):
+				row = list(hostinfo[metric]) + containerinfo[metric2] + containerinfo['hostalloc']
+				row += [metrics[metric3], metrics[metric4], nextmetrics[objfunc], nextmetrics[objfunc2]]
+				yield row
+		writeCSV(dirname + '/' + title + '.csv', rows)
 
 	def generateGraphs(self, dirname):
 		self.generateGraphsWithInterval(dirname, self.hostinfo, 'host', 'cpu')
@@ -292,5 +319,5 @@ class Stats():
 		self.generateCompleteDataset(dirname, self.workloadinfo, 'workloadinfo')
 		self.generateCompleteDataset(dirname, self.metrics, 'metrics')
 		self.generateCompleteDataset(dirname, self.activecontainerinfo, 'activecontainerinfo')
-		self.generateCompleteDataset(dirname, self.allcontainerinfo, 'allcontainerinfo')
+		self.generateCompleteDataset(dirname, self.getAllContainerInfo(), 'allcontainerinfo')
 		self.generateCompleteDataset(dirname, self.schedulerinfo, 'schedulerinfo')
\ No newline at end of file
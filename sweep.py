@@ -0,0 +1,102 @@
+import os, sys
+import optparse
+import subprocess
+import itertools
+import pandas as pd
+from glob import glob
+from concurrent.futures import ThreadPoolExecutor
+
+# Runs main.py for every scheduler x workload x seed combination in parallel
+# and collects the final metrics of all runs in one table. Each run is a
+# separate simulator process with its own seed and log directory
+usage = "usage: python sweep.py -s <schedulers> -w <workloads> -r <seeds>"
+
+parser = optparse.OptionParser(usage=usage)
+parser.add_option("-s", "--schedulers", action="store", dest="schedulers", default="GOBI",
+					help="Comma separated scheduler names (see python main.py -h)")
+parser.add_option("-w", "--workloads", action="store", dest="workloads", default="BWGD2",
+					help="Comma separated workload names (see python main.py -h)")
+parser.add_option("-r", "--seeds", action="store", dest="seeds", default="0",
+					help="Comma separated seeds")
+parser.add_option("--steps", action="store", dest="steps", default="100",
+					help="Number of simulation intervals of each run")
+parser.add_option("-j", "--jobs", action="store", dest="jobs", default=str(os.cpu_count()),
+					help="Number of runs in parallel")
+parser.add_option("-o", "--outdir", action="store", dest="outdir", default="logs/sweep",
+					help="Directory to save runs and summary in")
+opts, args = parser.parse_args()
+
+# Surrogate models (data type without the number of hosts) whose
+# normalization constants a scheduler loads. The *2 schedulers also run
+# the GOBI co-simulation of Stats
+SURROGATES = {
+	'GA': ['energy_latency'],
+	'GOBI': ['energy_latency'],
+	'SOGOBI': ['energy_latency'],
+	'GOBI2': ['energy_latency2', 'energy_latency'],
+	'SOGOBI2': ['energy_latency2', 'energy_latency'],
+	'HGOBI': ['stochastic_energy_latency'],
+	'HSOGOBI': ['stochastic_energy_latency'],
+	'HGOBI2': ['stochastic_energy_latency2', 'energy_latency'],
+	'HSOGOBI2': ['stochastic_energy_latency2', 'energy_latency'],
+}
+
+def prepareWorkloads(names):
+	# Build the trace stores (and derived Azure columns) once before the runs
+	# start, the runs then only map the same files read only
+	# main parses sys.argv on import, give it the defaults
+	sys.argv = sys.argv[:1]
+	from main import WORKLOADS
+	for name in names: WORKLOADS[name](1, 1)
+
+def prepareSurrogates(schedulers):
+	# Write the normalization sidecars of the surrogate models once, so that
+	# parallel runs of the same model only read them
+	sys.argv = sys.argv[:1]
+	from main import HOSTS
+	sys.path.append('scheduler/BaGTI/')
+	from scheduler.BaGTI.train import load_normalization
+	for model in sorted(set(m for s in schedulers for m in SURROGATES.get(s, []))):
+		load_normalization(model + '_' + str(HOSTS))
+
+def runExperiment(scheduler, workload, seed):
+	rundir = opts.outdir + '/' + '_'.join([scheduler, workload, str(seed)])
+	os.makedirs(rundir, exist_ok=True)
+	cmd = [sys.executable, 'main.py', '-s', scheduler, '-w', workload, '--seed', str(seed), \
+		'--steps', opts.steps, '--logdir', rundir]
+	# Runs are processes already, keep each of them to one thread
+	env = dict(os.environ, OMP_NUM_THREADS='1', MKL_NUM_THREADS='1')
+	with open(rundir + '/output.log', 'w') as f:
+		code = subprocess.call(cmd, stdout=f, stderr=subprocess.STDOUT, env=env)
+	return summarize(rundir, {'scheduler': scheduler, 'workload': workload, 'seed': seed, 'returncode': code})
+
+def summarize(rundir, row):
+	metrics = glob(rundir + '/*/metrics_with_interval.csv')
+	schedulerinfo = glob(rundir + '/*/schedulerinfo_with_interval.csv')
+	if not metrics or not schedulerinfo: return row
+	metrics, schedulerinfo = pd.read_csv(metrics[0]), pd.read_csv(schedulerinfo[0])
+	destroyed = metrics['numdestroyed'].sum()
+	row['energy'] = metrics['energytotalinterval'].sum()
+	row['energypercontainer'] = row['energy'] / destroyed if destroyed else 0
+	row['avgresponsetime'] = (metrics['avgresponsetime'] * metrics['numdestroyed']).sum() / destroyed if destroyed else 0
+	row['slaviolationspercentage'] = metrics['slaviolations'].sum() * 100.0 / destroyed if destroyed else 0
+	row['numdestroyed'] = destroyed
+	row['nummigrations'] = metrics['nummigrations'].sum()
+	row['avgschedulingtime'] = schedulerinfo['schedulingtime'].mean()
+	return row
+
+if __name__ == '__main__':
+	schedulers, workloads, seeds = opts.schedulers.split(','), opts.workloads.split(','), opts.seeds.split(',')
+	prepareWorkloads(workloads)
+	prepareSurrogates(schedulers)
+	experiments = list(itertools.product(schedulers, workloads, seeds))
+	# Threads only wait on the simulator processes
+	with ThreadPoolExecutor(max_workers=int(opts.jobs)) as pool:
+		rows = list(pool.map(lambda e: runExperiment(*e), experiments))
+	summary = pd.DataFrame(rows)
+	summary.to_csv(opts.outdir + '/summary.csv', index=False)
+	print(summary.to_string(index=False))
+	failed = summary[summary['returncode'] != 0]
+	for _, row in failed.iterrows():
+		print('Run', row['scheduler'], row['workload'], row['seed'], 'failed, see', \
+			opts.outdir + '/' + '_'.join([row['scheduler'], row['workload'], str(row['seed'])]) + '/output.log')
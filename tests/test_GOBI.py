@@ -0,0 +1,53 @@
+import torch
+from scheduler.GOBI import GOBIScheduler
+
+class Container():
+	def __init__(self, creationID):
+		self.creationID = creationID
+
+class Environment():
+	def __init__(self, creationIDs):
+		self.containerlist = [Container(cid) for cid in creationIDs]
+
+def warmStarted(creationIDs, hosts):
+	# GOBI with warm start, without loading a model
+	scheduler = GOBIScheduler.__new__(GOBIScheduler)
+	scheduler.warmstart, scheduler.hosts = True, hosts
+	scheduler.param, scheduler.creationIDs = None, None
+	scheduler.env = Environment(creationIDs)
+	return scheduler
+
+def optimizerStep(scheduler):
+	scheduler.optimizer.zero_grad()
+	(scheduler.param ** 2).sum().backward()
+	scheduler.optimizer.step()
+
+def test_warm_start_reuses_param_and_optimizer_state():
+	scheduler = warmStarted([10, 11, 12], hosts=2)
+	param = scheduler.warmStart(torch.rand(4, 3, 5, requires_grad=True))
+	optimizer = scheduler.optimizer
+	optimizerStep(scheduler)
+	allocation = param[..., -2:].detach().clone()
+	moments = {k: v.clone() for k, v in optimizer.state[param].items() if torch.is_tensor(v) and v.shape == param.shape}
+	init = torch.rand(4, 3, 5, requires_grad=True)
+	assert scheduler.warmStart(init) is param
+	assert scheduler.optimizer is optimizer
+	# Utilizations come from init, allocations and moments are kept
+	assert torch.equal(param[..., :-2], init[..., :-2])
+	assert torch.equal(param[..., -2:], allocation)
+	assert moments and all(torch.equal(optimizer.state[param][k], v) for k, v in moments.items())
+
+def test_warm_start_restarts_changed_containers():
+	scheduler = warmStarted([10, 11, 12], hosts=2)
+	param = scheduler.warmStart(torch.rand(4, 3, 5, requires_grad=True))
+	optimizerStep(scheduler)
+	allocation = param[..., -2:].detach().clone()
+	# Container 11 was destroyed and 13 created in its place
+	scheduler.env = Environment([10, 13, 12])
+	init = torch.rand(4, 3, 5, requires_grad=True)
+	scheduler.warmStart(init)
+	assert torch.equal(param[:, 1], init[:, 1])
+	assert torch.equal(param[:, [0, 2], -2:], allocation[:, [0, 2]])
+	for moment in scheduler.optimizer.state[param].values():
+		if torch.is_tensor(moment) and moment.shape == param.shape:
+			assert not moment[:, 1].any()
@@ -0,0 +1,49 @@
+import numpy as np
+from scheduler.PlacementEngine import PlacementEngine
+
+class Container():
+    def __init__(self, hostID):
+        self.hostID = hostID
+
+    def getHostID(self):
+        return self.hostID
+
+class Environment():
+    # Hosts with the given available IPS, RAM size and disk size (after the
+    # containers on them), containers with a host and requirements
+    def __init__(self, available, hostIDs, requirements):
+        self.available = np.array(available, dtype=float)
+        self.containers = [Container(hostID) for hostID in hostIDs]
+        self.requirements = np.array(requirements, dtype=float)
+
+    def getHostsAvailable(self):
+        return self.available.copy()
+
+    def getContainerRequirements(self, containerIDs):
+        return self.requirements[containerIDs].reshape(-1, 3)
+
+    def getContainerByID(self, containerID):
+        return self.containers[containerID]
+
+def test_container_on_current_host_is_counted_once():
+    env = Environment([[100, 100, 100], [0, 0, 0]], [0, -1], [[60, 60, 60], [60, 60, 60]])
+    engine = PlacementEngine(env)
+    engine.assign(0, 0, env.requirements[0])
+    assert np.array_equal(engine.residual, env.available)
+    # Container 1 still fits next to container 0
+    assert engine.firstFit([1]) == [(1, 0)]
+
+def test_migration_frees_current_host():
+    env = Environment([[40, 40, 40], [100, 100, 100]], [0, -1], [[60, 60, 60], [80, 80, 80]])
+    engine = PlacementEngine(env)
+    engine.assign(0, 1, env.requirements[0])
+    assert np.array_equal(engine.residual, [[100, 100, 100], [40, 40, 40]])
+    assert engine.firstFit([1]) == [(1, 0)]
+
+def test_feasibility_checks_all_resources():
+    env = Environment([[100, 10, 100], [50, 100, 100]], [-1], [[40, 20, 20]])
+    assert PlacementEngine(env).bestFit([0]) == [(0, 1)]
+
+def test_first_fit_decreasing():
+    env = Environment([[100, 100, 100], [100, 100, 100]], [-1, -1, -1], [[30, 1, 1], [70, 1, 1], [40, 1, 1]])
+    assert PlacementEngine(env).firstFitDecreasing([0, 1, 2]) == [(1, 0), (2, 1), (0, 0)]
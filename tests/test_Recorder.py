@@ -0,0 +1,33 @@
+import pickle
+import shutil
+from os import listdir, path
+from stats.Recorder import Recorder
+
+def test_chunks_survive_recreated_save_directory(tmp_path):
+	# As main.saveStats, which recreates the log directory on every save
+	recorder = Recorder(chunksize=5)
+	table = recorder.table('metrics')
+	dirname = str(tmp_path / 'logs')
+	for i in range(53):
+		table.append({'interval': i})
+		if i % 10 == 9:
+			shutil.rmtree(dirname, ignore_errors=True)
+			recorder.save(dirname)
+	shutil.rmtree(dirname, ignore_errors=True)
+	recorder.save(dirname, move=True)
+	assert sorted(listdir(dirname + '/records')) == sorted('metrics_' + str(k) + '.pk' for k in range(10))
+	with open(dirname + '/recorder.pk', 'wb') as f: pickle.dump(recorder, f)
+	with open(dirname + '/recorder.pk', 'rb') as f: saved = pickle.load(f)
+	assert [row['interval'] for row in saved.tables['metrics']] == list(range(53))
+
+def test_chunks_are_copied_once(tmp_path, monkeypatch):
+	copies = []
+	copy = shutil.copy
+	monkeypatch.setattr(shutil, 'copy', lambda src, dst: (copies.append(src), copy(src, dst)))
+	recorder = Recorder(chunksize=5)
+	table = recorder.table('metrics')
+	for i in range(50):
+		table.append({'interval': i})
+		if i % 10 == 9: recorder.save(str(tmp_path))
+	assert len(copies) == len(set(copies)) == 10
+	assert path.exists(str(tmp_path) + '/records/metrics_9.pk')
@@ -1,4 +1,8 @@
 # Constants
 
 LOCAL_REGRESSION_BANDWIDTH = 10
-LOCAL_REGRESSION_CPU_MULTIPLIER = 1.2
\ No newline at end of file
+LOCAL_REGRESSION_CPU_MULTIPLIER = 1.2
+# Intervals of utilization history kept by the threshold schedulers
+UTIL_HISTORY_CAPACITY = 100
+# Multiple correlations closer than this are ties in MaxCor selection
+MAX_CORRELATION_TIE = 1e-9
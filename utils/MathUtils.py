@@ -190,3 +190,94 @@ def loess(xvals, yvals, alpha, poly_degree=1, robustify=False):
     evalDF = evalDF[['loc','est', 'v', 'b', 'g']]
 
     return(locsDF, evalDF)
+
+
+
+def batch_loess(xvals, yvals, alpha, poly_degree=1, robustify=False):
+    """
+    Vectorized `loess` of many series sampled at the same xvals,
+    given as the rows of the H-by-n array `yvals`. All local
+    regressions are solved at once as a batched weighted least
+    squares. Returns:
+
+        v => the m x-value locations the LOESS is evaluated at
+        b => H-by-m-by-(poly_degree+1) local regression coefficient
+             estimates, of the last robustness cycle if `robustify`
+        g => H-by-m LOESS output for each series and location
+
+    which are the `v`, `b` and `g` of the last `loess` cycle of
+    each series. As in `loess`, every robustness cycle reweighs the
+    local weights by the residuals of the previous cycle and a
+    series stops once its estimates change by less than 5%.
+    """
+    order = np.argsort(xvals, kind='stable')
+    xvals = np.asarray(xvals, dtype=float)[order]
+    yvals = np.asarray(yvals, dtype=float)[:, order]
+
+    n = len(xvals)
+    m = n + 1
+    q = int(np.floor(n * alpha) if alpha <= 1.0 else n)
+    avg_interval = (xvals[-1] - xvals[0]) / n
+    v_lb = max(0, xvals[0] - (.5 * avg_interval))
+    v_ub = xvals[-1] + (.5 * avg_interval)
+    v = np.linspace(start=v_lb, stop=v_ub, num=m)
+
+    # Design matrices of the data points and of the locations.
+    X = np.vander(xvals, poly_degree + 1, increasing=True)
+    V = np.vander(v, poly_degree + 1, increasing=True)
+
+    # m-by-n tricube weights, scaled by the qth-nearest raw_dist.
+    raw_dists = np.abs(xvals[None, :] - v[:, None])
+    scaled_dists = raw_dists / np.sort(raw_dists, axis=1)[:, q-1:q]
+    weights = np.where(scaled_dists <= 1, (1 - scaled_dists ** 3) ** 3, 0)
+
+    def fit(W, y):
+        # b = (X^T*W*X)^-1*X^T*W*y for a stack of diagonal weights W.
+        XtW = X.T * W[..., None, :]
+        b = np.linalg.pinv(XtW @ X, hermitian=True) @ (XtW @ y[:, None, :, None])
+        return b[..., 0]
+
+    b = fit(weights, yvals)
+    g = np.sum(b * V, axis=-1)
+
+    if robustify:
+        active = np.ones(len(yvals), dtype=bool)
+        for cycle_nbr in range(1, 22):
+            # Residuals of each local regression at all xvals.
+            e1 = yvals[active][:, None, :] - b[active] @ X.T
+            e2 = e1 / (6 * np.median(np.abs(e1), axis=-1, keepdims=True))
+            r = np.where(np.abs(e2) < 1, (1 - e2 ** 2) ** 2, 0)
+            b_r = fit(weights * r, yvals[active])
+            g_r = np.sum(b_r * V, axis=-1)
+            idiffs = np.abs((g[active] - g_r) / g[active])
+            b[active], g[active] = b_r, g_r
+            active[active] = ~(np.all(idiffs < .05, axis=1) | (cycle_nbr > 20))
+            if not active.any(): break
+
+    return(v, b, g)
+
+
+
+def multiple_correlation(data):
+    """
+    Multiple correlation coefficient of each column of the T-by-k
+    array `data` with all other columns, i.e. the correlation of a
+    column with its least squares fit on the others. All columns
+    are scored from a single inverse of their correlation matrix C
+    as `sqrt(1 - 1/diag(C^-1))`. Constant columns score 0. If C is
+    singular, columns that are linear combinations of the others
+    have a perfect fit and score 1 (the rest 0).
+    """
+    R = np.zeros(data.shape[1])
+    varying = np.ptp(data, axis=0) > 0
+    if np.sum(varying) < 2: return(R)
+    C = np.corrcoef(data[:, varying], rowvar=False)
+    w, V = np.linalg.eigh(C)
+    singular = w < 1e-10 * w[-1]
+    if singular.any():
+        # Columns taking part in a null vector of C.
+        R[varying] = np.any(np.abs(V[:, singular]) > 1e-8, axis=1)
+    else:
+        Cinv_diag = np.sum(V ** 2 / w, axis=1)
+        R[varying] = np.sqrt(np.clip(1 - 1 / Cinv_diag, 0, 1))
+    return(R)
@@ -0,0 +1,54 @@
+import numpy as np
+from .MathConstants import *
+
+class RingBuffer():
+	# Last capacity rows of equal length, e.g. the utilization of every host
+	# in each interval. Rows are written in turn into a preallocated
+	# [capacity, width] array; len, indexing, slicing and np.asarray give
+	# the rows oldest first like a list of rows
+	def __init__(self, capacity=UTIL_HISTORY_CAPACITY):
+		self.capacity = capacity
+		self.data = None
+		self.start = 0
+		self.size = 0
+
+	def append(self, row):
+		row = np.asarray(row, dtype=float)
+		if self.data is None: self.data = np.zeros((self.capacity, len(row)))
+		self.data[(self.start + self.size) % self.capacity] = row
+		if self.size < self.capacity: self.size += 1
+		else: self.start = (self.start + 1) % self.capacity
+
+	def window(self, n=None):
+		# Last n rows (all by default) as a [n, width] array
+		n = self.size if n is None else min(n, self.size)
+		return self.data[(self.start + np.arange(self.size - n, self.size)) % self.capacity]
+
+	def __len__(self):
+		return self.size
+
+	def __getitem__(self, index):
+		if isinstance(index, slice):
+			return self.data[(self.start + np.arange(*index.indices(self.size))) % self.capacity]
+		if index < 0: index += self.size
+		if not 0 <= index < self.size: raise IndexError('ring buffer index out of range')
+		return self.data[(self.start + index) % self.capacity]
+
+	def __array__(self, dtype=None, copy=None):
+		return self.window().astype(dtype) if dtype else self.window()
+
+	# Statistics of each column over the window
+
+	def median(self):
+		return np.median(self.window(), axis=0)
+
+	def mad(self):
+		window = self.window()
+		return np.median(np.abs(window - np.median(window, axis=0)), axis=0)
+
+	def percentile(self, q):
+		return np.percentile(self.window(), q, axis=0)
+
+	def iqr(self):
+		q1, q3 = self.percentile([25, 75])
+		return q3 - q1
@@ -2,9 +2,23 @@ import os
 import logging
 import json
 import re
+from functools import wraps
 from subprocess import call
 from .ColorUtils import *
 
+def cachedPerInterval(func):
+	# Memoize a getter of a host or container until the environment
+	# moves to the next interval or its placement version changes
+	@wraps(func)
+	def wrapper(self):
+		key = (self.env.interval, self.env.version)
+		cached = self.__dict__.setdefault('cache', {}).get(func.__name__)
+		if cached and cached[0] == key: return cached[1]
+		value = func(self)
+		self.cache[func.__name__] = (key, value)
+		return value
+	return wrapper
+
 def printDecisionAndMigrations(decision, migrations):
 	print('Decision: [', end='')
 	for i, d in enumerate(decision):